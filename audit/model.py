@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.database.base import Base
+
+
+class AuditEvent(Base):
+    """
+    One create/update/delete of a catalog entity.
+
+    Rows are written in batches by ``audit.queue.AuditLog``; ``at`` is the
+    time of the change, not of the insert.
+    """
+
+    __tablename__ = "audit_events"
+    __table_args__ = (
+        Index("ix_audit_events_entity_entity_id_at", "entity", "entity_id", "at"),
+        Index("ix_audit_events_at_id", "at", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    entity: Mapped[str] = mapped_column(String(32), nullable=False)
+    entity_id: Mapped[int] = mapped_column(nullable=False)
+    action: Mapped[str] = mapped_column(String(16), nullable=False)
+    changes: Mapped[dict | None] = mapped_column(JSON, nullable=True)
@@ -0,0 +1,160 @@
+import asyncio
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core import metrics
+from core.config import AuditConfig, settings
+from core.logging import logging
+from .model import AuditEvent
+from .schema import AuditAction, AuditEntity
+
+
+class AuditLog:
+    """
+    Buffers audit events in memory and writes them in the background.
+
+    ``record`` only appends to a bounded queue, so writes pay no extra
+    round trip. A flusher task inserts the queued events with one
+    multi-row ``INSERT`` per ``batch_size`` events, as soon as a batch is
+    full or ``flush_interval`` seconds after the previous flush. When the
+    queue is full the ``overflow`` policy decides which event is lost.
+    Failed batches go back to the front of the queue and are retried on
+    the next flush. ``stop`` writes whatever is still queued.
+    """
+
+    def __init__(self, config: AuditConfig) -> None:
+        self.config = config
+        self._events: deque[dict[str, Any]] = deque()
+        self._batch_ready = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._session_factory: async_sessionmaker[AsyncSession] | None = None
+        self._flusher: asyncio.Task | None = None
+        self._stopping = False
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    async def record(
+        self,
+        entity: AuditEntity,
+        entity_id: int,
+        action: AuditAction,
+        changes: dict[str, Any] | None = None,
+    ) -> None:
+        """Queues one event; call it after the change is committed."""
+        if not self.config.enabled:
+            return
+        event = {
+            "at": datetime.now(),
+            "entity": entity.value,
+            "entity_id": entity_id,
+            "action": action.value,
+            "changes": changes,
+        }
+
+        if len(self._events) >= self.config.queue_size:
+            if self.config.overflow == "drop_oldest":
+                self._events.popleft()
+                metrics.AUDIT_EVENTS.inc(result="dropped")
+            elif not (self.config.overflow == "block" and await self._wait_for_space()):
+                metrics.AUDIT_EVENTS.inc(result="dropped")
+                return
+
+        self._events.append(event)
+        metrics.AUDIT_EVENTS.inc(result="queued")
+        if len(self._events) >= self.config.queue_size:
+            self._space.clear()
+        if len(self._events) >= self.config.batch_size:
+            self._batch_ready.set()
+
+    async def _wait_for_space(self) -> bool:
+        deadline = time.monotonic() + self.config.block_timeout
+        while len(self._events) >= self.config.queue_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._batch_ready.set()
+            try:
+                await asyncio.wait_for(self._space.wait(), remaining)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    def start(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        self._session_factory = session_factory
+        self._stopping = False
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self.config.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            written = await self.flush()
+            if self._events and not written and not self._stopping:
+                # The database is failing: back off instead of retrying on every event
+                await asyncio.sleep(self.config.flush_interval)
+
+    async def flush(self) -> int:
+        """
+        Writes queued events batch by batch and returns how many were
+        written; stops at the first failed batch.
+        """
+        written = 0
+        while self._events and self._session_factory is not None:
+            size = min(self.config.batch_size, len(self._events))
+            batch = [self._events.popleft() for _ in range(size)]
+            self._space.set()
+            started = time.perf_counter()
+            try:
+                async with self._session_factory() as session:
+                    await session.execute(insert(AuditEvent), batch)
+                    await session.commit()
+            except Exception as e:
+                logging.error(f"Audit flush of {len(batch)} events failed, will retry: {e}")
+                metrics.AUDIT_EVENTS.inc(len(batch), result="failed")
+                self._requeue(batch)
+                break
+            metrics.AUDIT_FLUSH_DURATION.observe(time.perf_counter() - started)
+            metrics.AUDIT_EVENTS.inc(len(batch), result="written")
+            written += len(batch)
+        return written
+
+    def _requeue(self, batch: list[dict[str, Any]]) -> None:
+        # Oldest events first; whatever does not fit any more is lost
+        room = max(self.config.queue_size - len(self._events), 0)
+        if room < len(batch):
+            metrics.AUDIT_EVENTS.inc(len(batch) - room, result="dropped")
+        self._events.extendleft(reversed(batch[:room]))
+        if len(self._events) >= self.config.queue_size:
+            self._space.clear()
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stops the flusher and writes the remaining events (up to ``timeout`` seconds)."""
+        if self._flusher is not None:
+            self._stopping = True
+            self._batch_ready.set()
+            try:
+                await asyncio.wait_for(self._flusher, timeout)
+            except asyncio.TimeoutError:
+                logging.warning("Audit flusher did not stop in time")
+            self._flusher = None
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        if self._events:
+            logging.error(f"Audit log stopped with {len(self._events)} unwritten events")
+
+
+audit_log = AuditLog(settings.audit)
+metrics.AUDIT_QUEUE_DEPTH.set_function(lambda: len(audit_log))
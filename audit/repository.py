@@ -0,0 +1,108 @@
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, bindparam, desc, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.database.statements import StatementCache
+from core.pagination import decode_cursor, encode_cursor
+from .model import AuditEvent
+from .schema import AuditEventResponse, AuditListRequest
+
+AUDIT_COLUMNS = [getattr(AuditEvent, field) for field in AuditEventResponse.model_fields]
+
+# list_events statements, one per combination of filters
+audit_statements = StatementCache("audit")
+
+
+def _audit_page_stmt(entity: bool, entity_id: bool, action: bool, after: bool) -> Select:
+    """
+    One page of events, newest first, keyset-paginated on ``(at, id)``.
+
+    Filtering by entity (and entity id) is served by
+    ``ix_audit_events_entity_entity_id_at``. All values are bind parameters.
+    """
+    def build() -> Select:
+        stmt = select(*AUDIT_COLUMNS)
+        if entity:
+            stmt = stmt.where(AuditEvent.entity == bindparam("entity"))
+        if entity_id:
+            stmt = stmt.where(AuditEvent.entity_id == bindparam("entity_id"))
+        if action:
+            stmt = stmt.where(AuditEvent.action == bindparam("action"))
+        if after:
+            stmt = stmt.where(
+                tuple_(AuditEvent.at, AuditEvent.id)
+                < tuple_(
+                    bindparam("after_at", type_=AuditEvent.at.type),
+                    bindparam("after_id"),
+                )
+            )
+        return stmt.order_by(desc(AuditEvent.at), desc(AuditEvent.id)).limit(bindparam("limit"))
+
+    return audit_statements.get((entity, entity_id, action, after), build)
+
+
+class AuditRepository:
+    def __init__(self):
+        """
+        Repository is stateless; session is passed per method.
+
+        Events are written by ``audit.queue.audit_log``, never here.
+        """
+        pass
+
+    async def list_events(self, session: AsyncSession, data: AuditListRequest) -> dict:
+        """
+        Returns one page of audit events, newest first.
+
+        The result is plain data shaped like ``AuditListResponse``, ready
+        for ``FastJSONResponse``; ``next_cursor`` is set while older events
+        exist.
+        """
+        params = {"limit": data.limit + 1}
+        if data.entity is not None:
+            params["entity"] = data.entity.value
+        if data.entity_id is not None:
+            params["entity_id"] = data.entity_id
+        if data.action is not None:
+            params["action"] = data.action.value
+        if data.after:
+            params["after_at"], params["after_id"] = self._decode_cursor(data.after)
+
+        stmt = _audit_page_stmt(
+            data.entity is not None,
+            data.entity_id is not None,
+            data.action is not None,
+            bool(data.after),
+        )
+        result = await session.execute(stmt, params)
+        keys = list(result.keys())
+        events = result.all()
+
+        next_cursor = None
+        if len(events) > data.limit:
+            events = events[: data.limit]
+            last = events[-1]
+            next_cursor = encode_cursor({"at": last.at.isoformat(), "id": last.id})
+
+        return {
+            "limit": data.limit,
+            "next_cursor": next_cursor,
+            "events": [dict(zip(keys, event)) for event in events],
+        }
+
+    @staticmethod
+    def _decode_cursor(token: str) -> tuple[datetime, int]:
+        try:
+            values = decode_cursor(token)
+            return datetime.fromisoformat(values["at"]), int(values["id"])
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor.",
+            )
+
+
+def get_audit_repo() -> AuditRepository:
+    return AuditRepository()
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.db_helper import db_helper
+from core.serialization import FastJSONResponse
+from .repository import AuditRepository, get_audit_repo
+from .schema import AuditListRequest, AuditListResponse
+
+router = APIRouter(
+    tags=["Audit"],
+    prefix="/audit"
+)
+
+
+@router.get(
+    "",
+    response_model=AuditListResponse,
+)
+async def list_audit_events(
+    data: AuditListRequest = Depends(),
+    session: AsyncSession = Depends(db_helper.read_session_getter),
+    repo: AuditRepository = Depends(get_audit_repo),
+):
+    # Events are written asynchronously and show up here after the next flush
+    payload = await repo.list_events(session=session, data=data)
+    return FastJSONResponse(payload)
@@ -0,0 +1,50 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any, List, Optional
+
+from pydantic import BaseModel, ConfigDict, field_validator
+
+MAX_AUDIT_PAGE_SIZE = 500
+
+
+class AuditEntity(str, Enum):
+    role = "role"
+    permission = "permission"
+
+
+class AuditAction(str, Enum):
+    create = "create"
+    update = "update"
+    delete = "delete"
+
+
+class AuditEventResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    at: datetime
+    entity: AuditEntity
+    entity_id: int
+    action: AuditAction
+    changes: Optional[dict[str, Any]] = None
+
+
+class AuditListRequest(BaseModel):
+    entity: Optional[AuditEntity] = None
+    entity_id: Optional[int] = None
+    action: Optional[AuditAction] = None
+    limit: int = 50
+    after: Optional[str] = None
+
+    @field_validator("limit")
+    @classmethod
+    def validate_limit(cls, value: int) -> int:
+        if not 0 < value <= MAX_AUDIT_PAGE_SIZE:
+            raise ValueError(f"Must be between 1 and {MAX_AUDIT_PAGE_SIZE}")
+        return value
+
+
+class AuditListResponse(BaseModel):
+    limit: int
+    next_cursor: Optional[str] = None
+    events: List[AuditEventResponse]
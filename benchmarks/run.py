@@ -0,0 +1,212 @@
+"""
+Drives the role and permission APIs in-process and reports latency as JSON.
+
+    python -m benchmarks.seed --reset --roles 100000 --permissions 100000
+    python -m benchmarks.run --requests 2000 --concurrency 32 --output before.json
+
+Every scenario sends ``--requests`` requests from ``--concurrency`` concurrent
+clients through an ASGI transport (no network, no server process), and
+reports throughput and p50/p95/p99 latency. Requires ``httpx``
+(``pip install .[bench]``).
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import func, select
+
+from core.db_helper import db_helper
+from main import create_app
+from permission.model import Permission
+from role.model import Role
+
+RequestFactory = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+def build_app() -> FastAPI:
+    return create_app()
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    elapsed: float = 0.0
+
+    def summary(self) -> dict:
+        ordered = sorted(self.latencies)
+        count = len(ordered)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "throughput_rps": round(count / self.elapsed, 1) if self.elapsed else 0.0,
+            "latency_ms": {
+                "mean": round(sum(ordered) / count * 1000, 3) if count else 0.0,
+                "p50": round(percentile(ordered, 50) * 1000, 3),
+                "p95": round(percentile(ordered, 95) * 1000, 3),
+                "p99": round(percentile(ordered, 99) * 1000, 3),
+                "max": round(ordered[-1] * 1000, 3) if count else 0.0,
+            },
+        }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    make_request: RequestFactory,
+    requests: int,
+    concurrency: int,
+) -> ScenarioResult:
+    result = ScenarioResult(name)
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        for index in counter:
+            started = time.perf_counter()
+            try:
+                response = await make_request(client, index)
+                ok = response.status_code < 400
+            except Exception:
+                ok = False
+            result.latencies.append(time.perf_counter() - started)
+            if not ok:
+                result.errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+async def table_sizes() -> tuple[int, int]:
+    async with db_helper.session_factory() as session:
+        roles = await session.scalar(select(func.count()).select_from(Role)) or 0
+        permissions = await session.scalar(select(func.count()).select_from(Permission)) or 0
+    return roles, permissions
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def benchmark(requests: int, concurrency: int, page_size: int, random_seed: int) -> dict:
+    rng = random.Random(random_seed)
+    roles, permissions = await table_sizes()
+    deep_role_page = max(1, roles // page_size)
+    deep_permission_page = max(1, permissions // page_size)
+    run_id = uuid.uuid4().hex[:8]
+    created_ids: list[int] = []
+
+    async def create(client, i):
+        response = await client.post("/roles/", json={"name": f"bench-new-{run_id}-{i}"})
+        if response.status_code == 201:
+            created_ids.append(response.json()["id"])
+        return response
+
+    scenarios: list[tuple[str, RequestFactory]] = [
+        ("role_create", create),
+        ("role_get", lambda c, i: c.get(f"/roles/{rng.randint(1, max(roles, 1))}")),
+        ("role_list_shallow", lambda c, i: c.get("/roles/", params={"page": 1, "limit": page_size})),
+        ("role_list_deep", lambda c, i: c.get(
+            "/roles/", params={"page": deep_role_page, "limit": page_size}
+        )),
+        ("role_list_filtered", lambda c, i: c.get(
+            "/roles/", params={"page": 1, "limit": page_size, "name": f"role-{rng.randint(0, 999)}"}
+        )),
+        ("permission_get", lambda c, i: c.get(
+            f"/permissions/{rng.randint(1, max(permissions, 1))}"
+        )),
+        ("permission_list_shallow", lambda c, i: c.get(
+            "/permissions", params={"page": 1, "limit": page_size}
+        )),
+        ("permission_list_deep", lambda c, i: c.get(
+            "/permissions", params={"page": deep_permission_page, "limit": page_size}
+        )),
+        ("permission_list_filtered", lambda c, i: c.get(
+            "/permissions",
+            params={"page": 1, "limit": page_size, "name": f"permission-{rng.randint(0, 999)}"},
+        )),
+        ("role_update", lambda c, i: c.put(
+            f"/roles/{created_ids[i % len(created_ids)]}",
+            json={"name": f"bench-upd-{run_id}-{i}"},
+        )),
+        ("role_delete", lambda c, i: c.delete(f"/roles/{created_ids[i]}")),
+    ]
+
+    results: dict[str, dict] = {}
+    app = build_app()
+    transport = httpx.ASGITransport(app=app)
+    # ASGITransport does not send lifespan events; run startup/shutdown explicitly
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        for name, make_request in scenarios:
+            count = requests
+            if name in ("role_update", "role_delete"):
+                # Only touch rows this run created
+                count = min(requests, len(created_ids))
+            if count == 0:
+                continue
+            result = await run_scenario(client, name, make_request, count, concurrency)
+            results[name] = result.summary()
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "requests": requests,
+            "concurrency": concurrency,
+            "page_size": page_size,
+            "seed": random_seed,
+            "roles": roles,
+            "permissions": permissions,
+        },
+        "scenarios": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1_000, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = asyncio.run(benchmark(args.requests, args.concurrency, args.page_size, args.seed))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
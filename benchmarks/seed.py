@@ -0,0 +1,117 @@
+"""
+Seeds the configured database with a synthetic role/permission catalog.
+
+    python -m benchmarks.seed --roles 100000 --permissions 1000000 --links-per-role 20
+
+Rows are written with multi-row INSERTs in batches; the summary is printed as
+JSON so runs can be compared.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from sqlalchemy import func, insert, select
+
+from audit.model import AuditEvent  # noqa: F401 - registers the table for create_all
+from core.database.base import Base
+from core.db_helper import db_helper
+from permission.model import Permission
+from role.model import Role, role_permission
+
+ROLE_PREFIX = "bench-role-"
+PERMISSION_PREFIX = "bench-permission-"
+
+
+async def insert_batches(conn, table, rows_iter, batch_size: int) -> int:
+    total = 0
+    batch = []
+    for row in rows_iter:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            await conn.execute(insert(table), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        await conn.execute(insert(table), batch)
+        total += len(batch)
+    return total
+
+
+async def seed(
+    roles: int,
+    permissions: int,
+    links_per_role: int,
+    batch_size: int,
+    reset: bool,
+    random_seed: int,
+) -> dict:
+    rng = random.Random(random_seed)
+    started = time.perf_counter()
+
+    async with db_helper.engine.begin() as conn:
+        if reset:
+            await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with db_helper.engine.begin() as conn:
+        await insert_batches(
+            conn,
+            Permission.__table__,
+            ({"name": f"{PERMISSION_PREFIX}{i}"} for i in range(permissions)),
+            batch_size,
+        )
+        await insert_batches(
+            conn,
+            Role.__table__,
+            ({"name": f"{ROLE_PREFIX}{i}"} for i in range(roles)),
+            batch_size,
+        )
+
+        permission_bounds = (await conn.execute(
+            select(func.min(Permission.id), func.max(Permission.id))
+        )).one()
+        role_ids = await conn.scalars(select(Role.id).order_by(Role.id))
+
+        def links():
+            low, high = permission_bounds
+            per_role = min(links_per_role, high - low + 1) if low is not None else 0
+            for role_id in role_ids:
+                for permission_id in rng.sample(range(low, high + 1), per_role):
+                    yield {"role_id": role_id, "permission_id": permission_id}
+
+        link_count = await insert_batches(conn, role_permission, links(), batch_size)
+
+    await db_helper.dispose()
+    return {
+        "roles": roles,
+        "permissions": permissions,
+        "links": link_count,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--roles", type=int, default=10_000)
+    parser.add_argument("--permissions", type=int, default=10_000)
+    parser.add_argument("--links-per-role", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate all tables first")
+    args = parser.parse_args()
+
+    summary = asyncio.run(seed(
+        roles=args.roles,
+        permissions=args.permissions,
+        links_per_role=args.links_per_role,
+        batch_size=args.batch_size,
+        reset=args.reset,
+        random_seed=args.seed,
+    ))
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Compares the hydrated and lean list paths for one page of roles.
+
+    python -m benchmarks.seed --roles 10000 --permissions 1000
+    python -m benchmarks.serialization --page-size 1000 --iterations 200
+
+``hydrated`` is the previous list path: ORM entities loaded into the
+identity map, wrapped in ``RoleListResponse`` and re-validated the way
+FastAPI's ``response_model`` does before ``json.dumps``. ``lean`` is
+``UserRepository.list_role`` (Core rows as dicts) rendered by
+``FastJSONResponse``. Both include the database round trip; counting is
+disabled so only the row path is measured. ``--sqlite`` runs against a
+throwaway in-memory SQLite database instead of the configured one
+(needs ``aiosqlite``).
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from benchmarks.run import percentile
+from core.database.base import Base
+from core.db_helper import db_helper
+from core.serialization import FastJSONResponse, orjson
+from role.model import Role
+from role.repository import UserRepository
+from role.schema import RoleListRequest, RoleListResponse
+
+
+async def hydrated(session, page_size: int) -> bytes:
+    roles = (await session.scalars(select(Role).order_by(Role.id).limit(page_size))).all()
+    response = RoleListResponse(page=1, limit=page_size, roles=roles)
+    validated = RoleListResponse.model_validate(response, from_attributes=True)
+    return json.dumps(validated.model_dump(mode="json")).encode()
+
+
+async def lean(session, page_size: int) -> bytes:
+    data = RoleListRequest(page=1, limit=page_size, include_total=False)
+    payload = await UserRepository().list_role(session, data)
+    return FastJSONResponse(payload).body
+
+
+async def measure(session_factory, path, page_size: int, iterations: int) -> dict:
+    timings = []
+    size = 0
+    for _ in range(iterations):
+        async with session_factory() as session:
+            started = time.perf_counter()
+            body = await path(session, page_size)
+            timings.append(time.perf_counter() - started)
+        size = len(body)
+    timings.sort()
+    return {
+        "p50_ms": round(percentile(timings, 50) * 1000, 3),
+        "p95_ms": round(percentile(timings, 95) * 1000, 3),
+        "mean_ms": round(sum(timings) / len(timings) * 1000, 3),
+        "body_bytes": size,
+    }
+
+
+async def sqlite_session_factory(rows: int):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        now = datetime.now()
+        await conn.execute(
+            insert(Role),
+            [{"name": f"bench-role-{i}", "created_at": now, "updated_at": now} for i in range(rows)],
+        )
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+
+async def benchmark(page_size: int, iterations: int, use_sqlite: bool) -> dict:
+    if use_sqlite:
+        engine, session_factory = await sqlite_session_factory(page_size)
+    else:
+        engine, session_factory = db_helper.engine, db_helper.session_factory
+
+    results = {}
+    try:
+        # Warm up connections and statement caches before timing
+        for path in (hydrated, lean):
+            await measure(session_factory, path, page_size, 3)
+        for name, path in (("hydrated", hydrated), ("lean", lean)):
+            results[name] = await measure(session_factory, path, page_size, iterations)
+    finally:
+        await engine.dispose()
+
+    return {
+        "meta": {
+            "backend": engine.dialect.name,
+            "encoder": "orjson" if orjson is not None else "json",
+            "page_size": page_size,
+            "iterations": iterations,
+        },
+        "paths": results,
+        "speedup_p50": round(results["hydrated"]["p50_ms"] / results["lean"]["p50_ms"], 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--sqlite", action="store_true", help="Use an in-memory SQLite database")
+    args = parser.parse_args()
+
+    report = asyncio.run(benchmark(args.page_size, args.iterations, args.sqlite))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
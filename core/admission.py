@@ -0,0 +1,266 @@
+import asyncio
+import functools
+import math
+import time
+from collections import deque
+from typing import AsyncGenerator, Callable
+
+from fastapi import HTTPException, Request, status
+
+from core import metrics
+from core.config import AdmissionConfig, DatabaseConfig, settings
+
+# Priority classes, highest first: writes are admitted before queued reads
+WRITE = "write"
+READ = "read"
+PRIORITIES = (WRITE, READ)
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Pools a session can be checked out from
+PRIMARY = "primary"
+REPLICA = "replica"
+
+
+class Rejected(Exception):
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+class Limiter:
+    """
+    Concurrency limit with a bounded FIFO wait queue per priority class.
+
+    A freed slot goes to the oldest waiter of the highest priority class
+    that may run; ``class_limits`` caps how many slots one class may hold.
+    """
+
+    def __init__(
+        self, limit: int, queue_size: int, class_limits: dict[str, int] | None = None
+    ) -> None:
+        self.limit = limit
+        self.queue_size = queue_size
+        self.class_limits = class_limits or {}
+        self.active = dict.fromkeys(PRIORITIES, 0)
+        self.waiters: dict[str, deque[asyncio.Future]] = {
+            priority: deque() for priority in PRIORITIES
+        }
+
+    def _can_run(self, priority: str) -> bool:
+        return (
+            sum(self.active.values()) < self.limit
+            and self.active[priority] < self.class_limits.get(priority, self.limit)
+        )
+
+    async def acquire(self, priority: str, timeout: float) -> None:
+        """Takes a slot or raises ``Rejected`` (queue full or ``timeout`` exceeded)."""
+        ahead = PRIORITIES[: PRIORITIES.index(priority) + 1]
+        if self._can_run(priority) and not any(self.waiters[p] for p in ahead):
+            self.active[priority] += 1
+            return
+
+        queue = self.waiters[priority]
+        if len(queue) >= self.queue_size:
+            raise Rejected("queue_full")
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over while the wait was ending
+                self.release(priority)
+            elif waiter in queue:
+                queue.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise Rejected("timeout")
+
+    def release(self, priority: str) -> None:
+        self.active[priority] -= 1
+        for waiting in PRIORITIES:
+            queue = self.waiters[waiting]
+            while queue and self._can_run(waiting):
+                waiter = queue.popleft()
+                if waiter.done():
+                    continue
+                self.active[waiting] += 1
+                waiter.set_result(None)
+
+    def waiting(self, priority: str) -> int:
+        return len(self.waiters[priority])
+
+
+class AdmissionController:
+    """
+    Admits requests only while the database pools can serve them.
+
+    ``admit`` (an application-wide dependency) holds a route slot: every
+    route has its own limiter, ``route_share`` of the capacity its reads
+    or writes normally use. The pool slot is taken by the session
+    dependencies through ``acquire``, once they know which pool the
+    session really comes from: writes and reads sent to the primary
+    (read-your-writes, replica fallback, no replicas) count against the
+    primary, where reads may hold at most ``read_share`` of it and queued
+    writes go first; other reads count against the replicas. A request
+    that finds its queue full or waits longer than ``max_wait`` in total
+    is answered with 503 and ``Retry-After`` instead of waiting for a
+    pool checkout timeout.
+
+    ``internal_connections`` of each pool are kept out of request
+    admission for work done on behalf of requests outside their sessions
+    (``acquire_internal``: DataLoader batches, the authorization rebuild):
+    it waits only for other such work, never for the requests it serves,
+    which may hold every request slot.
+    """
+
+    def __init__(self, config: AdmissionConfig, capacity: int, replica_capacity: int = 0) -> None:
+        self.config = config
+        reserved = config.internal_connections
+        capacity = max(capacity - reserved, 1)
+        read_limit = {READ: self._share(capacity, config.read_share)}
+        self.primary = Limiter(capacity, config.queue_size, class_limits=read_limit)
+        self.replica = None
+        self.internal = {PRIMARY: Limiter(reserved, config.queue_size)}
+        if replica_capacity:
+            self.replica = Limiter(max(replica_capacity - reserved, 1), config.queue_size)
+            self.internal[REPLICA] = Limiter(reserved, config.queue_size)
+        self.pools = [self.primary] + ([self.replica] if self.replica is not None else [])
+        self.routes: dict[tuple[str, str], Limiter] = {}
+
+        for priority in PRIORITIES:
+            metrics.ADMISSION_QUEUE_DEPTH.set_function(
+                lambda priority=priority: self.waiting(priority), priority=priority
+            )
+            metrics.ADMISSION_IN_FLIGHT.set_function(
+                lambda priority=priority: sum(pool.active[priority] for pool in self.pools),
+                priority=priority,
+            )
+
+    @classmethod
+    def from_config(
+        cls, config: AdmissionConfig, database: DatabaseConfig, reserved: int = 0
+    ) -> "AdmissionController":
+        """
+        Sizes the primary from ``pool_size + max_overflow`` minus the
+        ``reserved`` connections background tasks hold on it outside any
+        limiter, and the replicas from their pools.
+        """
+        replica_pool_size = database.replica_pool_size or database.pool_size
+        return cls(
+            config,
+            capacity=database.pool_size + database.max_overflow - reserved,
+            replica_capacity=len(database.replicas) * (replica_pool_size + database.max_overflow),
+        )
+
+    @staticmethod
+    def _share(capacity: int, share: float) -> int:
+        return max(math.ceil(capacity * share), 1)
+
+    def _pool(self, pool: str) -> Limiter:
+        if pool == REPLICA and self.replica is not None:
+            return self.replica
+        return self.primary
+
+    def _route(self, path: str, priority: str) -> Limiter:
+        key = (path, priority)
+        limiter = self.routes.get(key)
+        if limiter is None:
+            capacity = self._pool(REPLICA if priority == READ else PRIMARY).limit
+            limiter = self.routes[key] = Limiter(
+                self._share(capacity, self.config.route_share), self.config.queue_size
+            )
+        return limiter
+
+    def waiting(self, priority: str) -> int:
+        limiters = [*self.pools, *self.internal.values(), *self.routes.values()]
+        return sum(limiter.waiting(priority) for limiter in limiters)
+
+    @staticmethod
+    def _path(request: Request) -> str:
+        route = request.scope.get("route")
+        return getattr(route, "path", request.url.path)
+
+    def _applies(self, request: Request) -> bool:
+        return self.config.enabled and self._path(request) not in self.config.exempt_paths
+
+    def _rejected(self, route: str, priority: str, reason: str) -> HTTPException:
+        metrics.ADMISSION_REJECTIONS.inc(route=route, priority=priority, reason=reason)
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, retry later.",
+            headers={"Retry-After": str(self.config.retry_after)},
+        )
+
+    async def _acquire(
+        self, request: Request, limiter: Limiter, priority: str, stage: str
+    ) -> Callable[[], None]:
+        deadline = getattr(request.state, "admission_deadline", None)
+        started = time.monotonic()
+        if deadline is None:
+            deadline = request.state.admission_deadline = started + self.config.max_wait
+        try:
+            await limiter.acquire(priority, max(deadline - started, 0))
+        except Rejected as e:
+            raise self._rejected(self._path(request), priority, e.reason)
+        metrics.ADMISSION_WAIT.observe(time.monotonic() - started, priority=priority, stage=stage)
+        return functools.partial(limiter.release, priority)
+
+    async def admit(self, request: Request) -> AsyncGenerator[None, None]:
+        """
+        Application-wide dependency: holds a route slot for the rest of
+        the request.
+        """
+        if not self._applies(request):
+            yield
+            return
+
+        priority = READ if request.method in READ_METHODS else WRITE
+        release = await self._acquire(
+            request, self._route(self._path(request), priority), priority, stage="route"
+        )
+        try:
+            yield
+        finally:
+            release()
+
+    async def acquire(self, request: Request, pool: str, priority: str) -> Callable[[], None]:
+        """
+        Takes a slot of ``pool`` (``PRIMARY`` or ``REPLICA``) for a session
+        that is about to be checked out from it; returns the function that
+        gives it back. Raises 503 like ``admit``.
+        """
+        if not self._applies(request):
+            return _noop
+        return await self._acquire(request, self._pool(pool), priority, stage="pool")
+
+    async def acquire_internal(self, pool: str, work: str) -> Callable[[], None]:
+        """
+        Takes one of the ``internal_connections`` of ``pool`` for ``work``
+        (the label of rejections), waiting at most ``max_wait``; returns
+        the function that gives it back. Raises 503 like ``admit``.
+        """
+        if not self.config.enabled:
+            return _noop
+        limiter = self.internal.get(pool, self.internal[PRIMARY])
+        started = time.monotonic()
+        try:
+            await limiter.acquire(READ, self.config.max_wait)
+        except Rejected as e:
+            raise self._rejected(work, READ, e.reason)
+        metrics.ADMISSION_WAIT.observe(time.monotonic() - started, priority=READ, stage="internal")
+        return functools.partial(limiter.release, READ)
+
+
+def _noop() -> None:
+    pass
+
+
+# Primary connections held by background tasks: the RBAC snapshot writer
+# (its leader lock and the snapshot it builds) and the audit flusher
+BACKGROUND_CONNECTIONS = (2 if settings.snapshot.path else 0) + (1 if settings.audit.enabled else 0)
+
+# Shared by the app-wide dependency and the session dependencies in core.db_helper
+admission = AdmissionController.from_config(
+    settings.admission, settings.database, reserved=BACKGROUND_CONNECTIONS
+)
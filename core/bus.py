@@ -0,0 +1,250 @@
+import asyncio
+import json
+import uuid
+from typing import Callable, Iterable, Protocol
+
+from sqlalchemy.engine import make_url
+
+from core.config import BusConfig, settings
+from core.logging import logging
+
+# Handler receives the affected ids, or None for "everything in this topic"
+Handler = Callable[[list[int] | None], None]
+
+# Topics
+ROLES = "roles"
+PERMISSIONS = "permissions"
+# Role -> permission assignments and the role hierarchy
+ROLE_GRANTS = "role_grants"
+
+# Larger id sets are sent as a full flush: NOTIFY payloads are capped at 8000 bytes
+MAX_IDS_PER_MESSAGE = 500
+
+
+class Backend(Protocol):
+    async def start(self, receive: Callable[[str], None], resync: Callable[[], None]) -> None: ...
+
+    async def send(self, payload: str) -> None: ...
+
+    async def stop(self) -> None: ...
+
+
+class LocalBackend:
+    """
+    Delivers messages to every backend started on the same ``hub``.
+
+    With the default private hub a bus only talks to itself (single worker);
+    tests share one hub between several buses to stand in for workers.
+    """
+
+    def __init__(self, hub: set | None = None) -> None:
+        self.hub = hub if hub is not None else set()
+        self._receive: Callable[[str], None] | None = None
+
+    async def start(self, receive: Callable[[str], None], resync: Callable[[], None]) -> None:
+        self._receive = receive
+        self.hub.add(receive)
+
+    async def send(self, payload: str) -> None:
+        for receive in list(self.hub):
+            receive(payload)
+
+    async def stop(self) -> None:
+        self.hub.discard(self._receive)
+
+
+class PostgresBackend:
+    """
+    PostgreSQL LISTEN/NOTIFY on a dedicated asyncpg connection.
+
+    Notifications sent while the connection is down are lost, so after a
+    reconnect the bus is asked to ``resync`` (drop everything it caches).
+    """
+
+    def __init__(self, dsn: str, channel: str, retry_delay: float = 1.0) -> None:
+        self.dsn = dsn
+        self.channel = channel
+        self.retry_delay = retry_delay
+        self._connection = None
+        self._closing = False
+        self._reconnect_task: asyncio.Task | None = None
+        self._receive: Callable[[str], None] | None = None
+        self._resync: Callable[[], None] | None = None
+
+    async def start(self, receive: Callable[[str], None], resync: Callable[[], None]) -> None:
+        self._receive, self._resync = receive, resync
+        self._closing = False
+        await self._connect()
+
+    async def _connect(self) -> None:
+        import asyncpg
+
+        connection = await asyncpg.connect(self.dsn)
+        await connection.add_listener(self.channel, self._on_notify)
+        connection.add_termination_listener(self._on_terminated)
+        self._connection = connection
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        self._receive(payload)
+
+    def _on_terminated(self, connection) -> None:
+        if not self._closing and self._reconnect_task is None:
+            self._reconnect_task = asyncio.ensure_future(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        try:
+            while not self._closing:
+                try:
+                    await self._connect()
+                except Exception as e:
+                    logging.warning(f"Invalidation bus reconnect failed: {e}")
+                    await asyncio.sleep(self.retry_delay)
+                    continue
+                logging.info("Invalidation bus reconnected, dropping local caches")
+                self._resync()
+                return
+        finally:
+            self._reconnect_task = None
+
+    async def send(self, payload: str) -> None:
+        if self._connection is None or self._connection.is_closed():
+            raise ConnectionError("Invalidation bus is not connected")
+        await self._connection.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+
+    async def stop(self) -> None:
+        self._closing = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+
+class CatalogVersion:
+    """
+    In-process counter of applied invalidations, local or remote.
+
+    In-process consumers (caches, list ETag probes) compare it with the
+    value they saw to learn, without a query, whether any role or
+    permission changed since. It is per process and starts at 0, so it is
+    never compared across workers or sent to clients.
+    """
+
+    def __init__(self) -> None:
+        self.value = 0
+
+    def bump(self) -> None:
+        self.value += 1
+
+
+class InvalidationBus:
+    """
+    Fans cache invalidations out to every worker.
+
+    ``publish`` runs the local subscribers right away, so the writing worker
+    reads its own writes, and queues the message for the backend; a sender
+    task delivers it to the other workers in order, retrying until the
+    backend accepts it. Every applied message, local or remote, bumps
+    ``catalog_version``. Before ``start`` messages stay local, so every
+    process that writes (the API and CLI commands alike) starts the bus.
+    """
+
+    def __init__(self, backend: Backend, retry_delay: float = 1.0) -> None:
+        self.backend = backend
+        self.retry_delay = retry_delay
+        self.node_id = uuid.uuid4().hex
+        self.catalog_version = CatalogVersion()
+        self._handlers: dict[str, list[Handler]] = {}
+        self._outbox: asyncio.Queue[str] | None = None
+        self._sender: asyncio.Task | None = None
+
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        self._handlers.setdefault(topic, []).append(handler)
+
+    def unsubscribe(self, topic: str, handler: Handler) -> None:
+        handlers = self._handlers.get(topic, [])
+        if handler in handlers:
+            handlers.remove(handler)
+
+    def publish(self, topic: str, ids: Iterable[int] | None = None) -> None:
+        """
+        Invalidates ``ids`` of ``topic`` (or the whole topic) in every worker.
+        """
+        if ids is not None:
+            ids = sorted(set(ids))
+            if len(ids) > MAX_IDS_PER_MESSAGE:
+                ids = None
+        self._dispatch(topic, ids)
+
+        if self._outbox is not None:
+            self._outbox.put_nowait(
+                json.dumps({"origin": self.node_id, "topic": topic, "ids": ids})
+            )
+
+    def _dispatch(self, topic: str, ids: list[int] | None) -> None:
+        self.catalog_version.bump()
+        for handler in self._handlers.get(topic, ()):
+            try:
+                handler(ids)
+            except Exception as e:
+                logging.error(f"Invalidation handler for {topic} failed: {e}")
+
+    def _receive(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            origin, topic, ids = message["origin"], message["topic"], message["ids"]
+        except (ValueError, TypeError, KeyError) as e:
+            logging.error(f"Malformed invalidation message, dropping all caches: {e}")
+            self.resync()
+            return
+        if origin != self.node_id:
+            self._dispatch(topic, ids)
+
+    def resync(self) -> None:
+        """Drops everything every subscriber caches."""
+        for topic in list(self._handlers):
+            self._dispatch(topic, None)
+
+    async def start(self) -> None:
+        await self.backend.start(self._receive, self.resync)
+        self._outbox = asyncio.Queue()
+        self._sender = asyncio.create_task(self._send_loop())
+
+    async def _send_loop(self) -> None:
+        while True:
+            payload = await self._outbox.get()
+            while True:
+                try:
+                    await self.backend.send(payload)
+                    break
+                except Exception as e:
+                    logging.warning(f"Invalidation bus send failed, retrying: {e}")
+                    await asyncio.sleep(self.retry_delay)
+            self._outbox.task_done()
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Flushes queued messages (up to ``timeout`` seconds) and disconnects."""
+        if self._sender is None:
+            return
+        try:
+            await asyncio.wait_for(self._outbox.join(), timeout)
+        except asyncio.TimeoutError:
+            logging.warning(f"Invalidation bus stopped with {self._outbox.qsize()} unsent messages")
+        self._sender.cancel()
+        self._sender = None
+        self._outbox = None
+        await self.backend.stop()
+
+
+def build_backend(config: BusConfig) -> Backend:
+    if config.backend == "postgres":
+        dsn = make_url(str(settings.database.url)).set(drivername="postgresql")
+        return PostgresBackend(
+            dsn.render_as_string(hide_password=False),
+            channel=config.channel,
+            retry_delay=config.retry_delay,
+        )
+    return LocalBackend()
+
+
+bus = InvalidationBus(build_backend(settings.bus), retry_delay=settings.bus.retry_delay)
@@ -0,0 +1,138 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from pydantic import BaseModel
+
+from core.config import CacheConfig
+
+# Returned by ``LRUCache.get`` when the key is absent or expired
+CACHE_MISS = object()
+# Stored for keys known not to exist (negative caching of 404s)
+NEGATIVE = object()
+
+
+class CacheStats(BaseModel):
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+class LRUCache:
+    """
+    Size-bounded LRU cache with per-entry TTL and negative entries.
+
+    A read-through caller takes ``generation()`` before loading a missing
+    value and passes it to ``set``/``set_missing``: if the key was
+    invalidated (or the cache cleared) while the load was in flight, the
+    possibly stale result is dropped instead of cached. A value read from
+    a source that may lag (a replica) also passes ``settle``, and is
+    dropped if the key was invalidated less than ``settle`` seconds ago.
+    Invalidations are remembered for the ``max_size`` most recently
+    invalidated keys; older ones only count through ``_floor``, which
+    errs on the side of dropping a result.
+
+    Not thread-safe; it is meant to be used from a single event loop.
+    """
+
+    def __init__(self, max_size: int, ttl: float, negative_ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._generation = 0
+        # key -> (generation, monotonic time) of its last invalidation
+        self._invalidated: OrderedDict[Hashable, tuple[int, float]] = OrderedDict()
+        self._floor = (0, float("-inf"))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, config: CacheConfig) -> "LRUCache":
+        return cls(
+            max_size=config.max_size if config.enabled else 0,
+            ttl=config.ttl,
+            negative_ttl=config.negative_ttl,
+        )
+
+    @classmethod
+    def counts_from_config(cls, config: CacheConfig) -> "LRUCache":
+        return cls(
+            max_size=config.count_max_size if config.enabled else 0,
+            ttl=config.count_ttl,
+            negative_ttl=0,
+        )
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return CACHE_MISS
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return CACHE_MISS
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def generation(self) -> int:
+        """Token to pass to ``set``/``set_missing`` once a load finishes."""
+        return self._generation
+
+    def set(
+        self, key: Hashable, value: Any, generation: int | None = None, settle: float = 0.0
+    ) -> None:
+        if self._is_current(key, generation, settle):
+            self._put(key, value, self.ttl)
+
+    def set_missing(
+        self, key: Hashable, generation: int | None = None, settle: float = 0.0
+    ) -> None:
+        if self._is_current(key, generation, settle):
+            self._put(key, NEGATIVE, self.negative_ttl)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+        self._generation += 1
+        self._invalidated[key] = (self._generation, time.monotonic())
+        self._invalidated.move_to_end(key)
+        while len(self._invalidated) > max(self.max_size, 1):
+            _, (generation, invalidated_at) = self._invalidated.popitem(last=False)
+            self._floor = (max(self._floor[0], generation), max(self._floor[1], invalidated_at))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._generation += 1
+        self._invalidated.clear()
+        self._floor = (self._generation, time.monotonic())
+
+    def _is_current(self, key: Hashable, generation: int | None, settle: float) -> bool:
+        invalidated, invalidated_at = self._invalidated.get(key, self._floor)
+        if generation is not None and generation < invalidated:
+            return False
+        return settle <= 0 or invalidated_at <= time.monotonic() - settle
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            size=len(self._entries),
+            max_size=self.max_size,
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+        )
+
+    def _put(self, key: Hashable, value: Any, ttl: float) -> None:
+        if self.max_size <= 0 or ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
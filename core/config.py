@@ -1,4 +1,6 @@
-from pydantic import BaseModel, PostgresDsn
+from typing import Literal
+
+from pydantic import BaseModel, Field, PostgresDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class ServerConfig(BaseModel):
@@ -6,6 +8,13 @@ class ServerConfig(BaseModel):
     host: str
     app_path: str
     is_reload: bool
+
+    # `python main.py serve`: worker processes (None = CPU cores available to
+    # the process) and the total number of primary connections they may hold
+    workers: int | None = None
+    connection_budget: int | None = None
+    # Seconds a stopping worker waits for in-flight requests before closing them
+    graceful_timeout: float = 30.0
     
     
 class DatabaseConfig(BaseModel):
@@ -15,6 +24,24 @@ class DatabaseConfig(BaseModel):
     pool_size: int = 50
     max_overflow: int = 10
 
+    # Read replicas: GET routes are served from these when they are healthy
+    replicas: list[PostgresDsn] = []
+    replica_strategy: Literal["round_robin", "least_busy"] = "round_robin"
+    replica_pool_size: int | None = None
+    replica_retry_after: float = 5.0
+    # Seconds after a client's own commit during which its reads go to the
+    # primary; tracked per client with a cookie, so it holds across workers
+    read_your_writes_window: float = 2.0
+
+    # SQLAlchemy compiled-statement cache (per engine) and asyncpg
+    # prepared-statement cache (per connection); 0 disables either
+    query_cache_size: int = 500
+    prepared_statement_cache_size: int = 100
+
+    # Startup: connections opened per pool and hot queries run once before serving
+    prewarm_connections: int = 5
+    warm_statements: bool = True
+
     naming_convention: dict[str, str] = {
         "ix": "ix_%(column_0_label)s",
         "uq": "uq_%(table_name)s_%(column_0_name)s",
@@ -23,6 +50,66 @@ class DatabaseConfig(BaseModel):
         "pk": "pk_%(table_name)s",
     }    
 
+class CacheConfig(BaseModel):
+    enabled: bool = True
+    max_size: int = 10_000
+    ttl: float = 60.0
+    negative_ttl: float = 5.0
+    count_max_size: int = 1024
+    count_ttl: float = 300.0
+
+
+class LoggingConfig(BaseModel):
+    dir: str = "logs"
+    console_level: str = "INFO"
+    json_format: bool = False
+    queue_size: int = 10_000
+    block_timeout: float = 0.0
+
+
+class BusConfig(BaseModel):
+    # "postgres" (LISTEN/NOTIFY on database.url) when several workers share the data
+    backend: Literal["local", "postgres"] = "local"
+    channel: str = "role_invalidation"
+    retry_delay: float = 1.0
+
+
+class SnapshotConfig(BaseModel):
+    # Where the binary RBAC snapshot is kept up to date; None disables regeneration
+    path: str | None = None
+    debounce: float = 2.0
+
+
+class AuditConfig(BaseModel):
+    enabled: bool = True
+    # Events waiting for the flusher; when full, "block" waits up to
+    # block_timeout seconds for room and then drops like "drop_newest"
+    queue_size: int = 10_000
+    overflow: Literal["drop_newest", "drop_oldest", "block"] = "block"
+    block_timeout: float = 0.5
+    # A batch is written once it has batch_size events or flush_interval seconds passed
+    batch_size: int = 500
+    flush_interval: float = 1.0
+
+
+class AdmissionConfig(BaseModel):
+    enabled: bool = True
+    # Share of the pool capacity (pool_size + max_overflow) one route may hold,
+    # and the share reads may hold on the primary; the rest is kept for writes
+    route_share: float = Field(0.5, gt=0, le=1)
+    read_share: float = Field(0.8, gt=0, le=1)
+    # Requests waiting per priority class in each limiter, and the longest
+    # wait before 503 + Retry-After
+    queue_size: int = 100
+    max_wait: float = 1.0
+    retry_after: int = 1
+    exempt_paths: list[str] = ["/metrics"]
+    # Connections per pool kept out of request admission for work done on
+    # behalf of requests outside their sessions (DataLoader batches, the
+    # authorization rebuild)
+    internal_connections: int = Field(2, ge=1)
+
+
 class AppConfig(BaseSettings):
     
     model_config = SettingsConfigDict(
@@ -34,4 +121,13 @@ class AppConfig(BaseSettings):
     )
     
     database: DatabaseConfig
-    server: ServerConfig
\ No newline at end of file
+    cache: CacheConfig = CacheConfig()
+    logging: LoggingConfig = LoggingConfig()
+    bus: BusConfig = BusConfig()
+    snapshot: SnapshotConfig = SnapshotConfig()
+    audit: AuditConfig = AuditConfig()
+    admission: AdmissionConfig = AdmissionConfig()
+    server: ServerConfig
+
+
+settings = AppConfig()
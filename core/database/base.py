@@ -1,4 +1,13 @@
+from sqlalchemy import DDL, event
 from sqlalchemy.orm import DeclarativeBase
 
 class Base(DeclarativeBase):
-    pass
\ No newline at end of file
+    pass
+
+
+# Trigram indexes on name columns need the pg_trgm extension
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
@@ -0,0 +1,61 @@
+from typing import Any, Sequence
+
+from sqlalchemy import Row
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+BULK_BATCH_SIZE = 1000
+
+
+def insert_names_stmt(model: type[Any], names: Sequence[str]) -> Insert:
+    """
+    Multi-row ``INSERT ... ON CONFLICT (name) DO NOTHING`` for ``names``.
+    """
+    return (
+        insert(model)
+        .values([{"name": name} for name in names])
+        .on_conflict_do_nothing(index_elements=[model.name])
+    )
+
+
+async def insert_missing_names(
+    session: AsyncSession,
+    model: type[Any],
+    names: Sequence[str],
+    batch_size: int = BULK_BATCH_SIZE,
+) -> list[Any]:
+    """
+    Inserts rows for ``names`` that do not exist yet and returns the new rows.
+
+    Each batch is a single ``INSERT ... ON CONFLICT (name) DO NOTHING
+    RETURNING`` statement, so rows that already exist are skipped without an
+    error. The caller owns the transaction; nothing is committed here.
+    """
+    created: list[Any] = []
+    for start in range(0, len(names), batch_size):
+        batch = names[start:start + batch_size]
+        result = await session.scalars(
+            insert_names_stmt(model, batch).returning(model)
+        )
+        created.extend(result.all())
+    return created
+
+
+async def insert_missing_name_rows(
+    session: AsyncSession,
+    model: type[Any],
+    names: Sequence[str],
+    batch_size: int = BULK_BATCH_SIZE,
+) -> list[Row]:
+    """
+    Same as ``insert_missing_names`` but returns only the ``(id, name)``
+    rows that were new, without materializing ORM objects.
+    """
+    inserted: list[Row] = []
+    for start in range(0, len(names), batch_size):
+        batch = names[start:start + batch_size]
+        result = await session.execute(
+            insert_names_stmt(model, batch).returning(model.id, model.name)
+        )
+        inserted.extend(result.all())
+    return inserted
@@ -0,0 +1,25 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+
+@asynccontextmanager
+async def snapshot_connection(engine: AsyncEngine) -> AsyncIterator[AsyncConnection]:
+    """
+    Connection in a transaction whose queries all see one snapshot.
+
+    Under the default ``READ COMMITTED`` every statement sees the data
+    committed before it started, so a reader assembling several tables
+    with separate SELECTs can find a link to a row it never read. On
+    PostgreSQL this opens a ``REPEATABLE READ READ ONLY`` transaction
+    instead, which also runs on hot-standby replicas. SQLite (tests)
+    serialises writers and keeps its default.
+    """
+    async with engine.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            connection = await connection.execution_options(
+                isolation_level="REPEATABLE READ", postgresql_readonly=True
+            )
+        async with connection.begin():
+            yield connection
@@ -0,0 +1,65 @@
+from enum import Enum
+from typing import Any, Hashable
+
+from sqlalchemy import Select, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import CACHE_MISS, LRUCache
+
+
+class CountMode(str, Enum):
+    exact = "exact"
+    cached = "cached"
+    estimated = "estimated"
+
+
+_ESTIMATE_STMT = text(
+    "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"
+)
+
+
+def count_statement(stmt: Select) -> Select:
+    """``SELECT count(*)`` over ``stmt`` as a subquery."""
+    return select(func.count()).select_from(stmt.subquery())
+
+
+async def count_rows(
+    session: AsyncSession,
+    count_stmt: Select,
+    mode: CountMode,
+    cache: LRUCache,
+    cache_key: Hashable,
+    table_name: str,
+    filtered: bool,
+    params: dict[str, Any] | None = None,
+    settle: float = 0.0,
+) -> tuple[int, CountMode]:
+    """
+    Runs ``count_stmt`` (see ``count_statement``) with ``params`` and reports
+    which mode produced the total.
+
+    - ``exact`` always runs the count over the filtered subquery.
+    - ``cached`` answers from ``cache`` under ``cache_key`` and falls back to
+      an exact count on a miss; writes clear the cache. A count read from
+      a replica passes ``settle`` (see ``LRUCache``).
+    - ``estimated`` reads the planner's ``reltuples`` for unfiltered
+      queries on PostgreSQL and falls back to an exact count otherwise
+      (filtered query, other dialect, or a table never analyzed).
+    """
+    if mode is CountMode.estimated and not filtered:
+        if session.get_bind().dialect.name == "postgresql":
+            estimate = await session.scalar(_ESTIMATE_STMT, {"table_name": table_name})
+            if estimate is not None and estimate >= 0:
+                return int(estimate), CountMode.estimated
+
+    if mode is CountMode.cached:
+        cached = cache.get(cache_key)
+        if cached is not CACHE_MISS:
+            return cached, CountMode.cached
+        generation = cache.generation()
+
+    total = await session.scalar(count_stmt, params) or 0
+    if mode is CountMode.cached:
+        # Not cached if a write cleared the cache while counting
+        cache.set(cache_key, total, generation, settle)
+    return total, CountMode.exact
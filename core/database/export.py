@@ -0,0 +1,30 @@
+from typing import AsyncIterator
+
+from pydantic import BaseModel
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+EXPORT_BATCH_SIZE = 1000
+
+
+async def stream_ndjson(
+    session: AsyncSession,
+    stmt: Select,
+    schema: type[BaseModel],
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    Streams ``stmt`` as NDJSON, one ``schema`` document per line.
+
+    Rows come from a server-side cursor ``batch_size`` at a time and each
+    batch is emitted as one chunk, so memory stays flat and the first chunk
+    is sent before the whole result set has been read.
+    """
+    result = await session.stream_scalars(
+        stmt.execution_options(yield_per=batch_size)
+    )
+    async for partition in result.partitions():
+        yield b"".join(
+            schema.model_validate(row).model_dump_json().encode() + b"\n"
+            for row in partition
+        )
@@ -0,0 +1,60 @@
+from enum import Enum
+
+from sqlalchemy import ColumnElement, bindparam
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+NAME_PARAM = "name_pattern"
+
+
+class NameMatch(str, Enum):
+    contains = "contains"
+    prefix = "prefix"
+    exact = "exact"
+
+
+def escape_like(value: str, escape: str = "\\") -> str:
+    """
+    Escapes LIKE wildcards so user input is matched literally.
+    """
+    return (
+        value.replace(escape, escape * 2)
+        .replace("%", f"{escape}%")
+        .replace("_", f"{escape}_")
+    )
+
+
+def name_pattern(value: str, match: NameMatch) -> str:
+    """
+    The bound value for ``name_filter``: the name itself for ``exact``,
+    an escaped LIKE pattern otherwise.
+    """
+    if match is NameMatch.exact:
+        return value
+    if match is NameMatch.prefix:
+        return f"{escape_like(value)}%"
+    return f"%{escape_like(value)}%"
+
+
+def name_filter(
+    column: InstrumentedAttribute[str], match: NameMatch, param: str = NAME_PARAM
+) -> ColumnElement[bool]:
+    """
+    Builds the WHERE clause for a name filter against the bind parameter
+    ``param``; pass ``name_pattern(value, match)`` as its value. The clause
+    does not depend on the value, so statements using it can be built once
+    and reused.
+
+    - ``exact`` hits the unique index on ``name``.
+    - ``prefix`` is an anchored LIKE served by the ``text_pattern_ops`` index.
+    - ``contains`` is the plain ILIKE fallback; on PostgreSQL the pg_trgm GIN
+      index serves it instead of a sequential scan.
+
+    Names are stored lower-cased, so only ``contains`` needs ILIKE.
+    """
+    value = bindparam(param, type_=column.type)
+    if match is NameMatch.exact:
+        return column == value
+    if match is NameMatch.prefix:
+        return column.like(value, escape="\\")
+    return column.ilike(value, escape="\\")
@@ -0,0 +1,246 @@
+import codecs
+import csv
+import io
+import json
+import time
+from enum import Enum
+from typing import Any, AsyncIterator, Awaitable, Callable, List
+
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.database.bulk import insert_missing_name_rows
+from core.logging import logging
+
+IMPORT_BATCH_SIZE = 5000
+IMPORT_MAX_ERRORS = 1000
+# A CSV record longer than this is cut off (and fails to parse) instead of
+# buffering the rest of the body after an unbalanced quote
+IMPORT_MAX_RECORD_BYTES = 1024 * 1024
+# A line longer than this is dropped up to the next newline and reported
+# as a failed line, so a body without newlines is never buffered whole
+IMPORT_MAX_LINE_BYTES = 64 * 1024
+
+
+class ImportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class ImportParams(BaseModel):
+    format: ImportFormat = ImportFormat.ndjson
+    batch_size: int = Field(default=IMPORT_BATCH_SIZE, gt=0, le=50_000)
+
+
+class ImportLineError(BaseModel):
+    line: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    processed: int = 0
+    inserted: int = 0
+    skipped: int = 0
+    failed: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+    rows_per_second: float = 0.0
+    errors: List[ImportLineError] = []
+
+
+async def iter_raw_lines(
+    chunks: AsyncIterator[bytes], max_length: int = IMPORT_MAX_LINE_BYTES
+) -> AsyncIterator[bytes | None]:
+    """
+    Splits a byte stream into undecoded lines without buffering the whole body.
+
+    Only the unfinished last line is kept between chunks, and each byte is
+    scanned for a newline once. A line longer than ``max_length`` is
+    discarded up to the next newline and yielded as ``None``, so it still
+    takes its line number.
+    """
+    buffer = bytearray()
+    discarding = False
+    async for chunk in chunks:
+        scan = len(buffer)
+        buffer += chunk
+        start = 0
+        while (end := buffer.find(b"\n", scan)) >= 0:
+            if discarding:
+                discarding = False
+            elif end - start > max_length:
+                yield None
+            else:
+                yield bytes(buffer[start:end]).rstrip(b"\r")
+            start = scan = end + 1
+        del buffer[:start]
+        if len(buffer) > max_length:
+            if not discarding:
+                discarding = True
+                yield None
+            buffer.clear()
+    if buffer and not discarding:
+        yield bytes(buffer).rstrip(b"\r")
+
+
+async def iter_records(
+    chunks: AsyncIterator[bytes], fmt: ImportFormat
+) -> AsyncIterator[tuple[int, bytes | None]]:
+    """
+    Yields ``(first line number, raw record)`` pairs.
+
+    An NDJSON record is one line. A CSV record continues over newlines
+    inside quoted fields (an odd number of ``"`` so far), up to
+    ``IMPORT_MAX_RECORD_BYTES``. Records are not decoded here, so the
+    caller can report a line with invalid UTF-8 and go on. An over-long
+    line comes through as ``None`` and ends the CSV record it was part of.
+    """
+    line_no = 0
+    parts: list[bytes] = []
+    size = quotes = start = 0
+    async for line in iter_raw_lines(chunks):
+        line_no += 1
+        if line is None:
+            if parts:
+                yield start, b"\n".join(parts)
+                parts, size, quotes = [], 0, 0
+            yield line_no, None
+            continue
+        if line_no == 1 and line.startswith(codecs.BOM_UTF8):
+            line = line[len(codecs.BOM_UTF8):]
+        if fmt is ImportFormat.ndjson:
+            yield line_no, line
+            continue
+
+        if not parts:
+            start = line_no
+        parts.append(line)
+        size += len(line)
+        quotes += line.count(b'"')
+        if quotes % 2 == 0 or size > IMPORT_MAX_RECORD_BYTES:
+            yield start, b"\n".join(parts)
+            parts, size, quotes = [], 0, 0
+    if parts:
+        # Unterminated quoted field: the CSV parser reports it
+        yield start, b"\n".join(parts)
+
+
+def _parse_ndjson(line: str) -> dict[str, Any]:
+    row = json.loads(line)
+    if not isinstance(row, dict):
+        raise ValueError("Expected a JSON object")
+    return row
+
+
+def _read_csv_record(record: str) -> list[str]:
+    return next(csv.reader(io.StringIO(record, newline=""), strict=True), [])
+
+
+def _parse_csv(record: str, header: list[str]) -> dict[str, Any]:
+    cells = _read_csv_record(record)
+    if len(cells) != len(header):
+        raise ValueError(f"Expected {len(header)} columns, got {len(cells)}")
+    return dict(zip(header, cells))
+
+
+async def import_names(
+    session: AsyncSession,
+    model: type[Any],
+    schema: type[BaseModel],
+    chunks: AsyncIterator[bytes],
+    fmt: ImportFormat,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    max_errors: int = IMPORT_MAX_ERRORS,
+    on_inserted: Callable[[list[Row]], Awaitable[None]] | None = None,
+) -> ImportReport:
+    """
+    Loads ``name`` rows from an NDJSON or CSV stream into ``model``'s table.
+
+    Every line is validated with ``schema``; valid names are inserted in
+    batches of ``batch_size`` with ``ON CONFLICT DO NOTHING`` and each batch
+    is committed on its own, so a failure only loses the current batch.
+    CSV input must start with a header row containing a ``name`` column.
+    At most ``max_errors`` line errors are kept in the report.
+    ``on_inserted`` receives the new ``(id, name)`` rows after each commit.
+    """
+    report = ImportReport()
+    started = time.perf_counter()
+    header: list[str] | None = None
+    batch: list[str] = []
+    line_too_long = f"Line is longer than {IMPORT_MAX_LINE_BYTES} bytes"
+
+    async def flush() -> None:
+        rows = await insert_missing_name_rows(session, model, batch)
+        await session.commit()
+        if on_inserted is not None:
+            await on_inserted(rows)
+        inserted = len(rows)
+        report.inserted += inserted
+        report.skipped += len(batch) - inserted
+        report.batches += 1
+        batch.clear()
+
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        logging.info(
+            f"Import into {model.__tablename__}: {report.processed} rows, "
+            f"{report.inserted} inserted, {report.failed} failed, "
+            f"{report.processed / elapsed:.0f} rows/s"
+        )
+
+    async for line_no, raw in iter_records(chunks, fmt):
+        if raw is None:
+            # Over-long line, already discarded by iter_raw_lines
+            report.failed += 1
+            if len(report.errors) < max_errors:
+                report.errors.append(ImportLineError(line=line_no, error=line_too_long))
+            if fmt is ImportFormat.csv and header is None:
+                break
+            report.processed += 1
+            continue
+        if not raw.strip():
+            continue
+
+        if fmt is ImportFormat.csv and header is None:
+            try:
+                header = [
+                    column.strip().lower() for column in _read_csv_record(raw.decode("utf-8"))
+                ]
+            except (ValueError, csv.Error) as e:
+                header, error = [], f"Unreadable CSV header: {e}"
+            else:
+                error = "CSV header has no 'name' column"
+            if "name" not in header:
+                report.errors.append(ImportLineError(line=line_no, error=error))
+                report.failed += 1
+                break
+            continue
+
+        report.processed += 1
+        try:
+            # Decoded per record: invalid UTF-8 only fails its own line
+            line = raw.decode("utf-8")
+            row = _parse_ndjson(line) if fmt is ImportFormat.ndjson else _parse_csv(line, header)
+            batch.append(schema.model_validate(row).name)
+        except ValidationError as e:
+            report.failed += 1
+            if len(report.errors) < max_errors:
+                message = "; ".join(error["msg"] for error in e.errors())
+                report.errors.append(ImportLineError(line=line_no, error=message))
+            continue
+        except (ValueError, TypeError, AttributeError, csv.Error) as e:
+            report.failed += 1
+            if len(report.errors) < max_errors:
+                report.errors.append(ImportLineError(line=line_no, error=str(e)))
+            continue
+
+        if len(batch) >= batch_size:
+            await flush()
+
+    if batch:
+        await flush()
+
+    report.elapsed_seconds = round(time.perf_counter() - started, 3)
+    if report.elapsed_seconds > 0:
+        report.rows_per_second = round(report.processed / report.elapsed_seconds, 1)
+    return report
@@ -0,0 +1,34 @@
+from typing import Callable, Hashable, TypeVar
+
+from sqlalchemy.sql import Executable
+
+from core import metrics
+
+S = TypeVar("S", bound=Executable)
+
+
+class StatementCache:
+    """
+    Statements built once per query shape and reused for every call.
+
+    The shape key covers everything that changes the SQL (which filters
+    are present, paging mode); values go in bind parameters. Reusing the
+    statement object skips rebuilding the ``select()`` chain and lets
+    SQLAlchemy reuse its memoized cache key, so the compiled SQL comes
+    straight from the engine's compiled cache. Shapes are a small closed
+    set, so the cache is not bounded.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._statements: dict[Hashable, Executable] = {}
+
+    def get(self, shape: Hashable, build: Callable[[], S]) -> S:
+        stmt = self._statements.get(shape)
+        if stmt is None:
+            stmt = self._statements[shape] = build()
+            metrics.DB_STATEMENT_BUILDS.inc(cache=self.name)
+        return stmt
+
+    def __len__(self) -> int:
+        return len(self._statements)
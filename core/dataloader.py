@@ -0,0 +1,113 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from core import metrics
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+BatchFn = Callable[[AsyncSession, list[K]], Awaitable[dict[K, V]]]
+
+
+class DataLoader(Generic[K, V]):
+    """
+    Coalesces ``load`` calls made in the same event-loop tick into one batch.
+
+    Concurrent callers asking for the same key share one future, and the
+    batch function runs once per tick with the de-duplicated keys (split into
+    chunks of ``max_batch_size``). Keys missing from the batch result resolve
+    to ``None``.
+
+    Batches are kept per engine: the one ``bind(session)`` resolves when
+    given (e.g. routing a lazily routed session first), otherwise the
+    caller's ``session.bind``, so a caller reading from a replica is never
+    answered from the primary or the other way round. Each batch runs on a
+    short-lived session of its own on that engine, not on any caller's
+    session, which may be closed or in use by the time the batch runs.
+    Callers await the shared future through ``asyncio.shield``: a
+    cancelled caller gives up its own wait without failing the others
+    coalesced into the batch.
+
+    A batch first awaits ``admit(engine, label)`` when given, for a slot
+    that pays for its connection, and its statements are recorded under
+    ``loader:<name>`` rather than the route of whichever caller came first.
+    """
+
+    def __init__(
+        self,
+        batch_fn: BatchFn,
+        name: str,
+        max_batch_size: int = 1000,
+        bind: Callable[[AsyncSession], Awaitable[AsyncEngine]] | None = None,
+        admit: Callable[[AsyncEngine, str], Awaitable[Callable[[], None]]] | None = None,
+    ) -> None:
+        self.batch_fn = batch_fn
+        self.name = name
+        self.bind = bind
+        self.admit = admit
+        self.max_batch_size = max_batch_size
+        self._pending: dict[AsyncEngine, dict[K, asyncio.Future]] = {}
+        self._session_factories: dict[AsyncEngine, async_sessionmaker[AsyncSession]] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.keys_loaded = 0
+
+    async def load(self, session: AsyncSession, key: K) -> V | None:
+        loop = asyncio.get_running_loop()
+        engine = await self.bind(session) if self.bind is not None else session.bind
+        pending = self._pending.get(engine)
+        if pending is None:
+            pending = self._pending[engine] = {}
+            loop.call_soon(self._dispatch, engine)
+
+        future = pending.get(key)
+        if future is None:
+            future = pending[key] = loop.create_future()
+        return await asyncio.shield(future)
+
+    def _dispatch(self, engine: AsyncEngine) -> None:
+        pending = self._pending.pop(engine)
+        task = asyncio.ensure_future(self._run(engine, pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _session_factory(self, engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+        factory = self._session_factories.get(engine)
+        if factory is None:
+            factory = self._session_factories[engine] = async_sessionmaker(
+                bind=engine, autoflush=False, expire_on_commit=False
+            )
+        return factory
+
+    async def _run(self, engine: AsyncEngine, pending: dict[K, asyncio.Future]) -> None:
+        keys = list(pending)
+        label = f"loader:{self.name}"
+        # The task runs in a copy of the first caller's context
+        metrics.current_request.set(metrics.RequestStats({}, label=label))
+        try:
+            release = await self.admit(engine, label) if self.admit is not None else None
+            try:
+                results: dict[K, V] = {}
+                async with self._session_factory(engine)() as session:
+                    for start in range(0, len(keys), self.max_batch_size):
+                        batch = keys[start:start + self.max_batch_size]
+                        results.update(await self.batch_fn(session, batch))
+                        self.batches += 1
+            finally:
+                if release is not None:
+                    release()
+            self.keys_loaded += len(keys)
+        except Exception as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+                    # Retrieved here so that a batch whose callers all gave
+                    # up does not log "exception was never retrieved"
+                    future.exception()
+            return
+
+        for key, future in pending.items():
+            if not future.done():
+                future.set_result(results.get(key))
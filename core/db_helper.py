@@ -1,15 +1,152 @@
-from typing import AsyncGenerator
+import asyncio
+import itertools
+import math
+import time
+from typing import Any, AsyncGenerator, Awaitable, Callable, Literal, Sequence
 
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.engine.default import DefaultDialect
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncSession,
     async_sessionmaker,
     AsyncEngine,
 )
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from core.admission import PRIMARY, READ, REPLICA, WRITE, admission
 from core.config import settings
+from core.logging import logging
+from core import metrics
+
+
+# Set on responses to writes: until this wall-clock time the client reads the primary
+READ_YOUR_WRITES_COOKIE = "read_your_writes_until"
+
+# ExecutionContext.cache_hit -> metric label
+_CACHE_RESULTS = {
+    DefaultDialect.CACHE_HIT: "hit",
+    DefaultDialect.CACHE_MISS: "miss",
+    DefaultDialect.CACHING_DISABLED: "disabled",
+    DefaultDialect.NO_CACHE_KEY: "no_key",
+    DefaultDialect.NO_DIALECT_SUPPORT: "unsupported",
+}
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    label = "primary"
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            metrics.DB_POOL_TIMEOUTS.inc(pool=self.label)
+            raise
+        finally:
+            metrics.DB_POOL_WAIT.observe(time.perf_counter() - started, pool=self.label)
+
+    def recreate(self):
+        # dispose() swaps in a recreated pool; keep reporting under the same label
+        pool = super().recreate()
+        pool.label = self.label
+        return pool
+
+
+class Replica:
+    """One read replica: its own engine, pool and health state."""
+
+    def __init__(self, engine: AsyncEngine, label: str) -> None:
+        self.engine = engine
+        self.label = label
+        self.session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
+            bind=engine,
+            autoflush=False,
+            autocommit=False,
+            expire_on_commit=False,
+        )
+        self.unhealthy_until = 0.0
+
+    @property
+    def is_healthy(self) -> bool:
+        return self.unhealthy_until <= time.monotonic()
+
+    @property
+    def checked_out(self) -> int:
+        return self.engine.sync_engine.pool.checkedout()
+
+
+class RoutedSession(AsyncSession):
+    """
+    Read session that is routed on its first statement.
+
+    Requests answered from the in-process caches never touch the database,
+    so ``read_session_getter`` only gives the session a ``router``: the
+    first ``execute``/``get``/``stream``/``connection`` (or a DataLoader
+    through ``DatabaseHelper.routed_engine``) awaits it to take the
+    admission slot and bind the session to the chosen engine. Concurrent
+    first uses (``asyncio.gather`` over loaders) route it once.
+    """
+
+    def __init__(self, router: Callable[["RoutedSession"], Awaitable[None]], **kw: Any) -> None:
+        super().__init__(**kw)
+        self._router: Callable[[RoutedSession], Awaitable[None]] | None = router
+        self._routing = asyncio.Lock()
+
+    async def route(self) -> None:
+        if self._router is None:
+            return
+        async with self._routing:
+            if self._router is not None:
+                await self._router(self)
+                self._router = None
+
+    def rebind(self, engine: AsyncEngine) -> None:
+        """Points the session, still without a transaction, at ``engine``."""
+        self.sync_session.bind = engine.sync_engine
+        self.bind = engine
+
+    async def execute(self, *args: Any, **kw: Any) -> Any:
+        await self.route()
+        return await super().execute(*args, **kw)
+
+    async def scalar(self, *args: Any, **kw: Any) -> Any:
+        await self.route()
+        return await super().scalar(*args, **kw)
+
+    async def get(self, *args: Any, **kw: Any) -> Any:
+        await self.route()
+        return await super().get(*args, **kw)
+
+    async def get_one(self, *args: Any, **kw: Any) -> Any:
+        await self.route()
+        return await super().get_one(*args, **kw)
+
+    async def stream(self, *args: Any, **kw: Any) -> Any:
+        await self.route()
+        return await super().stream(*args, **kw)
+
+    async def connection(self, *args: Any, **kw: Any) -> Any:
+        await self.route()
+        return await super().connection(*args, **kw)
+
+    async def run_sync(self, *args: Any, **kw: Any) -> Any:
+        await self.route()
+        return await super().run_sync(*args, **kw)
 
 
 class DatabaseHelper:
+    """
+    Engines, pools and sessions for the primary and the read replicas.
+
+    Nothing is created at import time: engines are built on first use
+    (normally the application lifespan), so importing the app stays cheap.
+    """
+
     def __init__(
         self,
         url: str,
@@ -17,29 +154,270 @@ class DatabaseHelper:
         echo_pool: bool = False,
         pool_size: int = 5,
         max_overflow: int = 10,
+        replica_urls: Sequence[str] = (),
+        replica_strategy: Literal["round_robin", "least_busy"] = "round_robin",
+        replica_pool_size: int | None = None,
+        replica_retry_after: float = 5.0,
+        read_your_writes_window: float = 2.0,
+        query_cache_size: int = 500,
+        prepared_statement_cache_size: int = 100,
     ) -> None:
+        self.url = url
+        self.echo = echo
+        self.echo_pool = echo_pool
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.replica_urls = list(replica_urls)
+        self.replica_pool_size = replica_pool_size or pool_size
+        self.query_cache_size = query_cache_size
+        self.prepared_statement_cache_size = prepared_statement_cache_size
 
-        self.engine: AsyncEngine = create_async_engine(
+        self.replica_strategy = replica_strategy
+        self.replica_retry_after = replica_retry_after
+        self.read_your_writes_window = read_your_writes_window
+        self._round_robin = itertools.count()
+
+        self._engine: AsyncEngine | None = None
+        self._session_factory: async_sessionmaker[AsyncSession] | None = None
+        self._replicas: list[Replica] | None = None
+
+    def _create_engine(self, url: str, pool_size: int) -> AsyncEngine:
+        connect_args = {}
+        if make_url(url).get_driver_name() == "asyncpg":
+            connect_args["prepared_statement_cache_size"] = self.prepared_statement_cache_size
+        return create_async_engine(
             url=url,
-            echo=echo,
-            echo_pool=echo_pool,
+            echo=self.echo,
+            echo_pool=self.echo_pool,
             pool_size=pool_size,
-            max_overflow=max_overflow,
+            max_overflow=self.max_overflow,
+            poolclass=TimedQueuePool,
+            query_cache_size=self.query_cache_size,
+            connect_args=connect_args,
         )
 
-        self.session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
+    @property
+    def engine(self) -> AsyncEngine:
+        if self._engine is None:
+            self._engine = self._create_engine(self.url, self.pool_size)
+            self._instrument(
+                self._engine, label="primary", capacity=self.pool_size + self.max_overflow
+            )
+        return self._engine
+
+    @property
+    def session_factory(self) -> async_sessionmaker[AsyncSession]:
+        if self._session_factory is None:
+            self._session_factory = async_sessionmaker(
+                bind=self.engine,
+                autoflush=False,
+                autocommit=False,
+                expire_on_commit=False,
+            )
+        return self._session_factory
+
+    @property
+    def replicas(self) -> list[Replica]:
+        if self._replicas is None:
+            replicas = []
+            for index, replica_url in enumerate(self.replica_urls):
+                engine = self._create_engine(replica_url, self.replica_pool_size)
+                label = f"replica{index}"
+                self._instrument(
+                    engine, label=label, capacity=self.replica_pool_size + self.max_overflow
+                )
+                replica = Replica(engine, label)
+                self._watch_health(replica)
+                replicas.append(replica)
+            self._replicas = replicas
+        return self._replicas
+
+    @staticmethod
+    def _instrument(engine: AsyncEngine, label: str, capacity: int) -> None:
+        """
+        Hooks statement timing and compiled-cache outcomes into the engine
+        and exports live pool gauges.
+        """
+        sync_engine = engine.sync_engine
+        if isinstance(sync_engine.pool, TimedQueuePool):
+            sync_engine.pool.label = label
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def _before_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def _after_execute(conn, cursor, statement, parameters, context, executemany):
+            started = conn.info["query_started"].pop()
+            metrics.record_query(time.perf_counter() - started)
+            if context is not None:
+                metrics.DB_COMPILED_CACHE.inc(
+                    pool=label, result=_CACHE_RESULTS.get(context.cache_hit, "other")
+                )
+
+        @event.listens_for(sync_engine, "handle_error")
+        def _on_error(exception_context):
+            conn = exception_context.connection
+            if conn is not None and conn.info.get("query_started"):
+                conn.info["query_started"].pop()
+
+        # Read the pool through the engine: dispose() replaces it
+        metrics.DB_POOL_SIZE.set_function(lambda: sync_engine.pool.size(), pool=label)
+        metrics.DB_POOL_CHECKED_OUT.set_function(
+            lambda: sync_engine.pool.checkedout(), pool=label
+        )
+        metrics.DB_POOL_OVERFLOW.set_function(lambda: sync_engine.pool.overflow(), pool=label)
+        metrics.DB_POOL_UTILIZATION.set_function(
+            lambda: sync_engine.pool.checkedout() / capacity if capacity else 0.0, pool=label
+        )
+
+    def _watch_health(self, replica: Replica) -> None:
+        """
+        Marks the replica unhealthy for ``replica_retry_after`` seconds when
+        a connection to it cannot be opened or is lost, whoever used it (a
+        request session or a DataLoader batch), so routing skips it.
+        """
+
+        @event.listens_for(replica.engine.sync_engine, "handle_error")
+        def _on_error(exception_context):
+            if exception_context.connection is None or exception_context.is_disconnect:
+                replica.unhealthy_until = time.monotonic() + self.replica_retry_after
+                logging.warning(
+                    f"Read replica {replica.label} unavailable: "
+                    f"{exception_context.original_exception}"
+                )
+
+    async def prewarm(self, connections: int) -> int:
+        """
+        Opens up to ``connections`` pooled connections per engine concurrently
+        and returns them to the pool, so first requests skip the connect.
+        Returns the number of connections opened.
+        """
+        opened = 0
+        engines = [(self.engine, self.pool_size)]
+        engines += [(replica.engine, self.replica_pool_size) for replica in self.replicas]
+        for engine, pool_size in engines:
+            pending = [engine.connect() for _ in range(min(connections, pool_size))]
+            results = await asyncio.gather(
+                *(connection.start() for connection in pending), return_exceptions=True
+            )
+            for connection, result in zip(pending, results):
+                if isinstance(result, BaseException):
+                    logging.warning(f"Pool pre-warm connection failed: {result}")
+                    continue
+                opened += 1
+                await connection.close()
+        return opened
+
+    async def dispose(self) -> None:
+        if self._engine is not None:
+            await self._engine.dispose()
+        for replica in self._replicas or ():
+            await replica.engine.dispose()
+
+    async def session_getter(
+        self, request: Request, response: Response
+    ) -> AsyncGenerator[AsyncSession, None]:
+        release = await admission.acquire(request, PRIMARY, WRITE)
+        try:
+            async with self.session_factory() as session:
+                if self.replicas and self.read_your_writes_window > 0:
+                    event.listen(
+                        session.sync_session, "after_commit", lambda _: self._mark_write(response)
+                    )
+                yield session
+        finally:
+            release()
+
+    async def read_session_getter(self, request: Request) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Session for read-only routes, routed on its first statement
+        (``RoutedSession``): a request served from the caches takes no
+        admission slot and no connection.
+
+        Reads go to a healthy replica (round-robin or least busy pool);
+        only a client within ``read_your_writes_window`` seconds of its
+        own commit (``READ_YOUR_WRITES_COOKIE``) reads the primary, as do
+        all reads when no replica is configured or healthy. Admission
+        counts the request against the pool the session is bound to.
+        """
+        releases: list[Callable[[], None]] = []
+        reads_own_writes = self._reads_own_writes(request)
+
+        async def route(session: RoutedSession) -> None:
+            candidates = [] if reads_own_writes else self._replica_candidates()
+            if candidates:
+                releases.append(await admission.acquire(request, REPLICA, READ))
+                session.rebind(candidates[0].engine)
+            else:
+                releases.append(await admission.acquire(request, PRIMARY, READ))
+
+        session = RoutedSession(
+            route,
             bind=self.engine,
             autoflush=False,
             autocommit=False,
             expire_on_commit=False,
         )
+        try:
+            yield session
+        finally:
+            await session.close()
+            for release in releases:
+                release()
 
-    async def dispose(self) -> None:
-        await self.engine.dispose()
+    @staticmethod
+    async def routed_engine(session: AsyncSession) -> AsyncEngine:
+        """Engine the session reads from, routing a ``RoutedSession`` first."""
+        if isinstance(session, RoutedSession):
+            await session.route()
+        return session.bind
 
-    async def session_getter(self) -> AsyncGenerator[AsyncSession, None]:
-        async with self.session_factory() as session:
-            yield session
+    async def admit_internal(self, engine: AsyncEngine, work: str) -> Callable[[], None]:
+        """
+        Internal admission slot (``AdmissionController.acquire_internal``)
+        of the pool ``engine`` belongs to, for work outside request sessions.
+        """
+        pool = PRIMARY if engine is self.engine else REPLICA
+        return await admission.acquire_internal(pool, work)
+
+    def settle_time(self, session: AsyncSession) -> float:
+        """
+        How long after a key's last invalidation a value read through
+        ``session`` may be cached: at once from the primary, after
+        ``read_your_writes_window`` (the replica lag the app tolerates)
+        from a replica.
+        """
+        return 0.0 if session.bind is self.engine else self.read_your_writes_window
+
+    def _replica_candidates(self) -> list[Replica]:
+        if not self.replicas:
+            return []
+
+        healthy = [replica for replica in self.replicas if replica.is_healthy]
+        if self.replica_strategy == "least_busy":
+            return sorted(healthy, key=lambda replica: replica.checked_out)
+
+        start = next(self._round_robin) % len(healthy) if healthy else 0
+        return healthy[start:] + healthy[:start]
+
+    def _mark_write(self, response: Response) -> None:
+        # Wall-clock deadline: the client's next read may reach another worker
+        until = time.time() + self.read_your_writes_window
+        response.set_cookie(
+            READ_YOUR_WRITES_COOKIE,
+            f"{until:.3f}",
+            max_age=math.ceil(self.read_your_writes_window),
+            httponly=True,
+            samesite="lax",
+        )
+
+    @staticmethod
+    def _reads_own_writes(request: Request) -> bool:
+        try:
+            return float(request.cookies.get(READ_YOUR_WRITES_COOKIE, "")) > time.time()
+        except ValueError:
+            return False
 
 
 db_helper = DatabaseHelper(
@@ -48,4 +426,11 @@ db_helper = DatabaseHelper(
     echo_pool=settings.database.echo_pool,
     pool_size=settings.database.pool_size,
     max_overflow=settings.database.max_overflow,
-)
\ No newline at end of file
+    replica_urls=[str(url) for url in settings.database.replicas],
+    replica_strategy=settings.database.replica_strategy,
+    replica_pool_size=settings.database.replica_pool_size,
+    replica_retry_after=settings.database.replica_retry_after,
+    read_your_writes_window=settings.database.read_your_writes_window,
+    query_cache_size=settings.database.query_cache_size,
+    prepared_statement_cache_size=settings.database.prepared_statement_cache_size,
+)
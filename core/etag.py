@@ -0,0 +1,51 @@
+import hashlib
+from datetime import datetime
+from typing import Hashable
+
+from fastapi import Request, Response, status
+
+
+def _etag(entity: str, content: bytes) -> str:
+    digest = hashlib.blake2b(content, digest_size=12, person=entity.encode()[:16])
+    return f'"{digest.hexdigest()}"'
+
+
+def resource_etag(entity: str, entity_id: int, updated_at: datetime) -> str:
+    """
+    Strong ETag of a single row from its ``(id, updated_at)``, scoped by
+    ``entity`` so that role 1 and permission 1 never share a tag. Every
+    UPDATE bumps ``updated_at``, so the pair changes whenever the row does.
+    """
+    return _etag(entity, f"{entity_id}:{updated_at.isoformat()}".encode())
+
+
+def collection_etag(entity: str, request: Request, version: Hashable) -> str:
+    """
+    Strong ETag of a list response, known before the page is read.
+
+    ``version`` is a cheap probe of the rows the request's filter selects
+    (for the repositories: count, latest ``updated_at`` and highest id),
+    which changes on every insert, update or delete among them. The path
+    and the sorted query string are part of the tag, so different pages,
+    limits and count modes of one filter never share it.
+    """
+    query = sorted(request.query_params.multi_items())
+    return _etag(entity, repr((request.url.path, query, version)).encode())
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Evaluates ``If-None-Match`` against ``etag`` (weak comparison, as
+    RFC 9110 requires for this header).
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in header.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
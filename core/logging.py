@@ -1,10 +1,13 @@
+import json
 import logging
 import os
-from logging.handlers import TimedRotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 from datetime import datetime
 
+from core.config import LoggingConfig
+
 # --- Base setup ---
-LOG_DIR = "logs"
 LEVELS = ["debug", "info", "warning", "error", "critical"]
 RETENTION_DAYS = {
     "debug": 5,
@@ -14,10 +17,6 @@ RETENTION_DAYS = {
     "critical": 30
 }
 
-# Ensure log folders exist
-for level in LEVELS:
-    os.makedirs(os.path.join(LOG_DIR, level), exist_ok=True)
-
 
 # --- Formatters ---
 detailed_formatter = logging.Formatter(
@@ -33,48 +32,145 @@ console_formatter = logging.Formatter(
 debug_formatter = logging.Formatter("%(levelname)s | %(name)s | %(message)s")  # no timestamp
 
 
-# --- Filters per level ---
-class LevelFilter(logging.Filter):
-    """Filter logs by level name."""
-    def __init__(self, level_name):
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line for log shippers."""
+    def format(self, record):
+        payload = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "location": f"{record.filename}:{record.lineno}",
+            "func": record.funcName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+# --- Handlers ---
+class LevelDispatchHandler(logging.Handler):
+    """Routes a record to the file handler of its exact level in one lookup."""
+    def __init__(self, handlers: dict[int, logging.Handler]):
         super().__init__()
-        self.level_name = level_name.upper()
-
-    def filter(self, record):
-        return record.levelname == self.level_name
-
-
-# --- Root logger ---
-logger = logging.getLogger()
-logger.setLevel(logging.DEBUG)
-
+        self.handlers = handlers
+
+    def emit(self, record):
+        handler = self.handlers.get(record.levelno)
+        if handler is not None:
+            handler.handle(record)
+
+    def close(self):
+        for handler in self.handlers.values():
+            handler.close()
+        super().close()
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Enqueues records for the listener thread without blocking the event loop.
+
+    When the queue is full, records at ``block_level`` or above wait up to
+    ``block_timeout`` seconds for room; everything else is dropped at once.
+    Dropped records are counted per level.
+    """
+    def __init__(self, log_queue: queue.Queue, block_level: int, block_timeout: float):
+        super().__init__(log_queue)
+        self.block_level = block_level
+        self.block_timeout = block_timeout
+        self.dropped: dict[str, int] = {level.upper(): 0 for level in LEVELS}
+
+    def enqueue(self, record):
+        try:
+            if record.levelno >= self.block_level and self.block_timeout > 0:
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped[record.levelname] = self.dropped.get(record.levelname, 0) + 1
+
+
+_listener: QueueListener | None = None
+_queue_handler: BoundedQueueHandler | None = None
+
+
+def configure_logging(config: LoggingConfig) -> None:
+    """
+    Installs the queue-based pipeline on the root logger.
+
+    The root logger only gets a ``BoundedQueueHandler``; a ``QueueListener``
+    thread does the formatting and the console/file I/O. Log directories are
+    created here rather than at import time. Calling it again is a no-op.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    file_formatter = JsonFormatter() if config.json_format else None
+    today = datetime.now().strftime("%Y-%m-%d")  # prefix date in filename
+
+    # --- Console handler ---
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(config.console_level.upper())
+    console_handler.setFormatter(file_formatter or console_formatter)
+
+    # --- File handlers per level ---
+    file_handlers: dict[int, logging.Handler] = {}
+    for level in LEVELS:
+        os.makedirs(os.path.join(config.dir, level), exist_ok=True)
+        filename = os.path.join(config.dir, level, f"{today}_{level}_log.log")
+        handler = TimedRotatingFileHandler(
+            filename,
+            when="midnight",
+            interval=1,
+            backupCount=RETENTION_DAYS[level],
+            encoding="utf-8"
+        )
+        # Formatter: debug simplified, others detailed
+        if file_formatter is not None:
+            handler.setFormatter(file_formatter)
+        elif level == "debug":
+            handler.setFormatter(debug_formatter)
+        else:
+            handler.setFormatter(detailed_formatter)
+        file_handlers[getattr(logging, level.upper())] = handler
+
+    log_queue: queue.Queue = queue.Queue(maxsize=config.queue_size)
+    _queue_handler = BoundedQueueHandler(
+        log_queue,
+        block_level=logging.ERROR,
+        block_timeout=config.block_timeout,
+    )
+    _listener = QueueListener(
+        log_queue,
+        console_handler,
+        LevelDispatchHandler(file_handlers),
+        respect_handler_level=True,
+    )
 
-# --- Console handler ---
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.INFO)
-console_handler.setFormatter(console_formatter)
-logger.addHandler(console_handler)
+    # --- Root logger ---
+    root = logging.getLogger()
+    root.setLevel(logging.DEBUG)
+    root.addHandler(_queue_handler)
+    _listener.start()
 
 
-# --- File handlers per level ---
-today = datetime.now().strftime("%Y-%m-%d")  # prefix date in filename
+def shutdown_logging() -> None:
+    """Flushes queued records and closes the file handlers."""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
 
-for level in LEVELS:
-    filename = os.path.join(LOG_DIR, level, f"{today}_{level}_log.log")
-    handler = TimedRotatingFileHandler(
-        filename,
-        when="midnight",
-        interval=1,
-        backupCount=RETENTION_DAYS[level],
-        encoding="utf-8"
-    )
-    handler.setLevel(getattr(logging, level.upper()))
-    handler.addFilter(LevelFilter(level))  # only this level
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+    _queue_handler = None
 
-    # Formatter: debug simplified, others detailed
-    if level == "debug":
-        handler.setFormatter(debug_formatter)
-    else:
-        handler.setFormatter(detailed_formatter)
 
-    logger.addHandler(handler)
\ No newline at end of file
+def dropped_records() -> dict[str, int]:
+    """Records dropped because the queue was full, by level."""
+    if _queue_handler is None:
+        return {}
+    return dict(_queue_handler.dropped)
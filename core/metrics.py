@@ -0,0 +1,310 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Iterable, Sequence
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from core.logging import LEVELS, dropped_records
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        return self.header() + list(self.samples())
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for key, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """
+    Gauge whose samples are either set explicitly or read from a callback
+    at scrape time (``set_function``), e.g. live pool statistics.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._functions: dict[tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float], **labels: str) -> None:
+        self._functions[self._key(labels)] = function
+
+    def samples(self) -> Iterable[str]:
+        values = dict(self._values)
+        for key, function in self._functions.items():
+            values[key] = function()
+        for key, value in values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # per label set: [bucket counts..., sum, count]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def samples(self) -> Iterable[str]:
+        for key, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(series[-2])}"
+            yield f"{self.name}_count{labels} {series[-1]}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+# --- Database metrics ---
+DB_QUERY_DURATION = registry.histogram(
+    "db_query_duration_seconds", "Database statement latency.", ["route"]
+)
+DB_QUERIES_PER_REQUEST = registry.histogram(
+    "db_queries_per_request", "Database statements executed per HTTP request.", ["route"],
+    buckets=COUNT_BUCKETS,
+)
+DB_POOL_WAIT = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.", ["pool"]
+)
+DB_POOL_TIMEOUTS = registry.counter(
+    "db_pool_checkout_timeouts_total", "Checkouts that hit the pool timeout.", ["pool"]
+)
+DB_POOL_SIZE = registry.gauge("db_pool_size", "Configured pool_size.", ["pool"])
+DB_POOL_CHECKED_OUT = registry.gauge(
+    "db_pool_checked_out", "Connections currently checked out.", ["pool"]
+)
+DB_POOL_OVERFLOW = registry.gauge(
+    "db_pool_overflow", "Connections open beyond pool_size (negative while the pool warms up).",
+    ["pool"],
+)
+DB_POOL_UTILIZATION = registry.gauge(
+    "db_pool_utilization", "Checked out connections / (pool_size + max_overflow).", ["pool"]
+)
+DB_COMPILED_CACHE = registry.counter(
+    "db_compiled_cache_total",
+    "Statements executed, by SQLAlchemy compiled-cache outcome (hit, miss, ...).",
+    ["pool", "result"],
+)
+DB_STATEMENT_BUILDS = registry.counter(
+    "db_statement_builds_total", "Statements built for a new query shape.", ["cache"]
+)
+
+
+# --- Audit log ---
+AUDIT_EVENTS = registry.counter(
+    "audit_events_total", "Audit events by outcome (queued, written, failed, dropped).", ["result"]
+)
+AUDIT_QUEUE_DEPTH = registry.gauge("audit_queue_depth", "Audit events waiting to be written.")
+AUDIT_FLUSH_DURATION = registry.histogram(
+    "audit_flush_duration_seconds", "Time to insert one batch of audit events."
+)
+
+
+# --- Logging ---
+LOG_RECORDS_DROPPED = registry.gauge(
+    "log_records_dropped",
+    "Log records dropped because the log queue was full, since logging was configured.",
+    ["level"],
+)
+for _level in LEVELS:
+    LOG_RECORDS_DROPPED.set_function(
+        lambda level=_level.upper(): dropped_records().get(level, 0), level=_level
+    )
+
+
+# --- Admission control ---
+ADMISSION_QUEUE_DEPTH = registry.gauge(
+    "admission_queue_depth", "Requests waiting for admission.", ["priority"]
+)
+ADMISSION_IN_FLIGHT = registry.gauge(
+    "admission_in_flight", "Admitted requests holding a pool slot.", ["priority"]
+)
+ADMISSION_REJECTIONS = registry.counter(
+    "admission_rejections_total", "Requests answered with 503 (queue_full or timeout).",
+    ["route", "priority", "reason"],
+)
+ADMISSION_WAIT = registry.histogram(
+    "admission_wait_seconds", "Time admitted requests waited for a route or pool slot.",
+    ["priority", "stage"],
+)
+
+
+# --- Per-request accounting ---
+class RequestStats:
+    """
+    Statements run in one request, or under ``label`` in work done outside
+    any request's session (e.g. ``loader:roles`` for DataLoader batches).
+    """
+
+    __slots__ = ("scope", "queries", "label")
+
+    def __init__(self, scope: dict, label: str | None = None) -> None:
+        self.scope = scope
+        self.queries = 0
+        self.label = label
+
+    @property
+    def route(self) -> str:
+        if self.label is not None:
+            return self.label
+        route = self.scope.get("route")
+        return getattr(route, "path", "unmatched")
+
+
+current_request: ContextVar[RequestStats | None] = ContextVar("current_request", default=None)
+
+
+def record_query(duration: float) -> None:
+    """Called from the engine hooks for every executed statement."""
+    stats = current_request.get()
+    if stats is None:
+        DB_QUERY_DURATION.observe(duration, route="none")
+        return
+    stats.queries += 1
+    DB_QUERY_DURATION.observe(duration, route=stats.route)
+
+
+class DatabaseMetricsMiddleware:
+    """
+    ASGI middleware that scopes query accounting to a request and records the
+    number of statements per route once the response is done.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = current_request.set(stats)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_request.reset(token)
+            DB_QUERIES_PER_REQUEST.observe(stats.queries, route=stats.route)
+
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
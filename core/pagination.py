@@ -0,0 +1,28 @@
+import base64
+import json
+from typing import Any
+
+
+def encode_cursor(values: dict[str, Any]) -> str:
+    """
+    Packs keyset values into an opaque, URL-safe token.
+    """
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str) -> dict[str, Any]:
+    """
+    Unpacks a token produced by ``encode_cursor``.
+
+    Raises ``ValueError`` if the token is malformed.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if not isinstance(values, dict):
+        raise ValueError("Invalid cursor")
+    return values
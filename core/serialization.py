@@ -0,0 +1,48 @@
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "speedups" extra
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Encodes plain dicts/lists/scalars (and datetimes) to compact JSON bytes.
+
+    Uses ``orjson`` when it is installed and the standard library otherwise;
+    both produce the same ISO 8601 datetimes pydantic does.
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, default=_default, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response for payloads that are already plain data.
+
+    Returning it from a route bypasses ``response_model`` validation and
+    ``jsonable_encoder``; the route's ``response_model`` still documents
+    the shape in OpenAPI.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
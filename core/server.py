@@ -0,0 +1,120 @@
+import os
+from dataclasses import dataclass
+
+from core.config import AppConfig
+
+# Settings the workers read at startup; uvicorn spawns them fresh, so the
+# parent passes each worker's share of the budget through the environment
+POOL_SIZE_ENV = "APP_CONFIG__DATABASE__POOL_SIZE"
+MAX_OVERFLOW_ENV = "APP_CONFIG__DATABASE__MAX_OVERFLOW"
+REPLICA_POOL_SIZE_ENV = "APP_CONFIG__DATABASE__REPLICA_POOL_SIZE"
+
+
+@dataclass(frozen=True)
+class PoolShare:
+    """Connections one worker may open against a single database server."""
+
+    pool_size: int
+    max_overflow: int
+    replica_pool_size: int | None = None
+
+    @property
+    def capacity(self) -> int:
+        return self.pool_size + self.max_overflow
+
+
+def available_cores() -> int:
+    """CPU cores this process may run on (respects affinity / cpusets)."""
+    if hasattr(os, "sched_getaffinity"):
+        return max(len(os.sched_getaffinity(0)), 1)
+    return os.cpu_count() or 1
+
+
+def _split(share: int, pool_size: int, max_overflow: int) -> tuple[int, int]:
+    # Keeps the configured pool/overflow ratio; at least one pooled connection
+    configured = pool_size + max_overflow
+    if configured <= share:
+        return pool_size, max_overflow
+    size = max(share * pool_size // configured, 1)
+    return size, max(share - size, 0)
+
+
+def split_connection_budget(
+    budget: int,
+    workers: int,
+    pool_size: int,
+    max_overflow: int,
+    replica_pool_size: int | None = None,
+    replicas: bool = False,
+    listener: bool = False,
+) -> PoolShare:
+    """
+    Divides ``budget`` connections per database server between ``workers``.
+
+    During a rolling restart the replacement worker is up before the one it
+    replaces is stopped, so with several workers one spare share is kept
+    for it. ``listener`` reserves each worker's LISTEN connection of the
+    invalidation bus on the primary. Configured sizes are only ever
+    shrunk, never grown.
+    """
+    shares = workers + 1 if workers > 1 else 1
+    reserved = shares if listener else 0
+    share = (budget - reserved) // shares
+    if share < 1:
+        raise ValueError(
+            f"Connection budget {budget} is too small for {workers} workers "
+            f"(needs at least {shares + reserved})"
+        )
+
+    size, overflow = _split(share, pool_size, max_overflow)
+    replica_size = None
+    if replicas:
+        # Replica engines share max_overflow with the primary and hold no LISTEN connection
+        replica_size = max(min(replica_pool_size or pool_size, budget // shares - overflow), 1)
+    return PoolShare(size, overflow, replica_size)
+
+
+def apply_connection_budget(config: AppConfig, workers: int, budget: int) -> PoolShare:
+    """
+    Computes each worker's share of ``budget`` and exports it to the
+    environment the workers are started with.
+    """
+    database = config.database
+    share = split_connection_budget(
+        budget,
+        workers,
+        database.pool_size,
+        database.max_overflow,
+        database.replica_pool_size,
+        replicas=bool(database.replicas),
+        listener=config.bus.backend == "postgres",
+    )
+    os.environ[POOL_SIZE_ENV] = str(share.pool_size)
+    os.environ[MAX_OVERFLOW_ENV] = str(share.max_overflow)
+    if share.replica_pool_size is not None:
+        os.environ[REPLICA_POOL_SIZE_ENV] = str(share.replica_pool_size)
+    return share
+
+
+def serve(config: AppConfig, workers: int, graceful_timeout: float) -> None:
+    """
+    Runs ``config.server.app_path`` under uvicorn with ``workers`` processes.
+
+    Workers stop gracefully: they stop accepting, wait up to
+    ``graceful_timeout`` seconds for in-flight requests and then run the
+    lifespan shutdown, which disposes their pools. ``SIGHUP`` to the parent
+    replaces the workers one at a time the same way, ``SIGTERM`` / ``SIGINT``
+    stop them all. ``SIGTTIN`` adds a worker outside the budget.
+    """
+    import uvicorn
+
+    server = config.server
+    uvicorn.run(
+        server.app_path,
+        host=server.host,
+        port=server.port,
+        reload=server.is_reload,
+        workers=workers,
+        lifespan="on",
+        timeout_graceful_shutdown=max(round(graceful_timeout), 1),
+    )
@@ -1,5 +1,259 @@
+import argparse
+import asyncio
+import sys
+import time
+from typing import TYPE_CHECKING, AsyncIterator
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def create_app() -> "FastAPI":
+    """
+    Builds the ASGI application.
+
+    Imports happen here rather than at module level so CLI commands stay
+    light; engines, pools and log files are only created by the lifespan.
+    """
+    started = time.perf_counter()
+
+    from contextlib import asynccontextmanager
+
+    from fastapi import Depends, FastAPI, Request
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from pydantic import ValidationError
+
+    from audit.queue import audit_log
+    from audit.router import router as audit_router
+    from core import metrics
+    from core.admission import admission
+    from core.bus import bus
+    from core.config import settings
+    from core.db_helper import db_helper
+    from core.logging import configure_logging, logging, shutdown_logging
+    from permission.repository import warm_statements as warm_permission_statements
+    from permission.router import router as permission_router
+    from role.repository import warm_statements as warm_role_statements
+    from role.router import router as role_router
+    from role.snapshot import SnapshotWriter
+
+    async def warm_statements() -> None:
+        factories = [db_helper.session_factory]
+        factories += [replica.session_factory for replica in db_helper.replicas]
+        for factory in factories:
+            for warm in (warm_role_statements, warm_permission_statements):
+                async with factory() as session:
+                    try:
+                        await warm(session)
+                    except Exception as e:
+                        logging.warning(f"Statement warm-up failed: {e}")
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        configure_logging(settings.logging)
+        snapshot_writer = None
+        try:
+            await bus.start()
+            audit_log.start(db_helper.session_factory)
+            if settings.snapshot.path:
+                snapshot_writer = SnapshotWriter(
+                    settings.snapshot.path, db_helper.session_factory, settings.snapshot.debounce
+                )
+                snapshot_writer.attach(bus)
+                snapshot_writer.schedule()
+
+            opened = await db_helper.prewarm(settings.database.prewarm_connections)
+            if settings.database.warm_statements:
+                await warm_statements()
+            logging.info(
+                f"Startup complete in {time.perf_counter() - started:.3f}s "
+                f"({opened} connections pre-opened)"
+            )
+            yield
+        finally:
+            if snapshot_writer is not None:
+                snapshot_writer.detach(bus)
+                await snapshot_writer.stop()
+            await bus.stop()
+            await audit_log.stop()
+            await db_helper.dispose()
+            logging.info("Shutdown complete")
+            shutdown_logging()
+
+    # Every route waits for a route slot first, its session for a slot of the
+    # pool it uses; saturated pools answer 503
+    app = FastAPI(title="role", lifespan=lifespan, dependencies=[Depends(admission.admit)])
+
+    # Validators of Depends() query models raise ValidationError from the
+    # dependency itself, which FastAPI would otherwise turn into a 500
+    @app.exception_handler(ValidationError)
+    async def validation_error_handler(request: Request, exc: ValidationError) -> JSONResponse:
+        return JSONResponse(
+            status_code=422,
+            content={"detail": jsonable_encoder(exc.errors(include_url=False, include_context=False))},
+        )
+
+    app.add_middleware(metrics.DatabaseMetricsMiddleware)
+    app.include_router(role_router)
+    app.include_router(permission_router)
+    app.include_router(audit_router)
+    app.include_router(metrics.router)
+    return app
+
+
+def __getattr__(name: str):
+    # `uvicorn main:app` builds the app on first access; CLI commands never do
+    if name == "app":
+        app = globals()["app"] = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+async def read_file(path: str) -> AsyncIterator[bytes]:
+    with open(path, "rb") as file:
+        while chunk := await asyncio.to_thread(file.read, READ_CHUNK_SIZE):
+            yield chunk
+
+
+async def run_import(entity: str, path: str, fmt: str, batch_size: int) -> None:
+    from audit.queue import audit_log
+    from core.bus import bus
+    from core.config import settings
+    from core.database.importer import ImportFormat
+    from core.db_helper import db_helper
+    from core.logging import configure_logging, shutdown_logging
+    from permission.repository import PermissionRepository
+    from role.repository import UserRepository
+
+    configure_logging(settings.logging)
+    try:
+        # Running workers only drop their cached catalog via the bus
+        await bus.start()
+        audit_log.start(db_helper.session_factory)
+        async with db_helper.session_factory() as session:
+            if entity == "permissions":
+                report = await PermissionRepository().import_permissions(
+                    session, read_file(path), ImportFormat(fmt), batch_size
+                )
+            else:
+                report = await UserRepository().import_roles(
+                    session, read_file(path), ImportFormat(fmt), batch_size
+                )
+    finally:
+        await bus.stop()
+        await audit_log.stop()
+        await db_helper.dispose()
+        shutdown_logging()
+
+    print(report.model_dump_json(indent=2))
+
+
+async def run_snapshot(path: str | None) -> None:
+    from core.config import settings
+    from core.db_helper import db_helper
+    from core.logging import configure_logging, shutdown_logging
+    from role.snapshot import SnapshotWriter
+
+    path = path or settings.snapshot.path
+    if not path:
+        raise SystemExit("snapshot: pass a path or set APP_CONFIG__SNAPSHOT__PATH")
+
+    configure_logging(settings.logging)
+    try:
+        size = await SnapshotWriter(path, db_helper.session_factory).write()
+    finally:
+        await db_helper.dispose()
+        shutdown_logging()
+
+    print(f"{path}: {size} bytes")
+
+
+def run_serve(workers: int | None, budget: int | None, graceful_timeout: float | None) -> None:
+    from core.config import settings
+    from core.server import apply_connection_budget, available_cores, serve
+
+    server = settings.server
+    workers = workers or server.workers or available_cores()
+    if server.is_reload:
+        # The reloader supervises a single process
+        workers = 1
+    budget = budget or server.connection_budget
+    if graceful_timeout is None:
+        graceful_timeout = server.graceful_timeout
+
+    database = settings.database
+    if budget is not None:
+        try:
+            share = apply_connection_budget(settings, workers, budget)
+        except ValueError as e:
+            raise SystemExit(f"serve: {e}")
+        print(
+            f"Connection budget {budget}: {workers} workers x "
+            f"(pool_size={share.pool_size}, max_overflow={share.max_overflow})",
+            file=sys.stderr,
+        )
+    elif workers > 1:
+        print(
+            f"Warning: no connection budget, {workers} workers may open up to "
+            f"{workers * (database.pool_size + database.max_overflow)} primary connections",
+            file=sys.stderr,
+        )
+
+    serve(settings, workers, graceful_timeout)
+
+
 def main():
-    print("Hello from role!")
+    parser = argparse.ArgumentParser(prog="role")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser(
+        "import", help="Stream an NDJSON or CSV catalog file into the database"
+    )
+    import_parser.add_argument("entity", choices=["permissions", "roles"])
+    import_parser.add_argument("path")
+    import_parser.add_argument(
+        "--format",
+        choices=["ndjson", "csv"],
+        help="Input format (default: guessed from the file extension)",
+    )
+    import_parser.add_argument("--batch-size", type=int, default=5000)
+
+    snapshot_parser = commands.add_parser(
+        "snapshot", help="Write the binary role -> permission snapshot for sidecars"
+    )
+    snapshot_parser.add_argument(
+        "path", nargs="?", help="Output file (default: APP_CONFIG__SNAPSHOT__PATH)"
+    )
+
+    serve_parser = commands.add_parser(
+        "serve", help="Run the API with several worker processes (SIGHUP restarts them gracefully)"
+    )
+    serve_parser.add_argument(
+        "--workers", type=int, help="Worker processes (default: server.workers or CPU cores)"
+    )
+    serve_parser.add_argument(
+        "--connection-budget",
+        type=int,
+        help="Primary connections shared by all workers (default: server.connection_budget)",
+    )
+    serve_parser.add_argument(
+        "--graceful-timeout",
+        type=float,
+        help="Seconds to drain in-flight requests on stop/restart (default: server.graceful_timeout)",
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "import":
+        fmt = args.format or ("csv" if args.path.endswith(".csv") else "ndjson")
+        asyncio.run(run_import(args.entity, args.path, fmt, args.batch_size))
+    elif args.command == "snapshot":
+        asyncio.run(run_snapshot(args.path))
+    elif args.command == "serve":
+        run_serve(args.workers, args.connection_budget, args.graceful_timeout)
 
 
 if __name__ == "__main__":
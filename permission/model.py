@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import DateTime, func
+from sqlalchemy import DateTime, Index, func
 from datetime import datetime
 
 
@@ -9,6 +9,20 @@ from core.database.base import Base
 class Permission(Base):
     
     __tablename__ = "permissions"
+    __table_args__ = (
+        Index("ix_permissions_created_at_id", "created_at", "id"),
+        Index(
+            "ix_permissions_name_pattern",
+            "name",
+            postgresql_ops={"name": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_permissions_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(
@@ -1,16 +1,164 @@
-from sqlalchemy import desc, func, select
+import asyncio
+from datetime import datetime
+from typing import AsyncIterator
+
+from sqlalchemy import Row, Select, bindparam, delete, desc, func, insert, select, tuple_, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
+from audit.queue import audit_log
+from audit.schema import AuditAction, AuditEntity
+from core.bus import PERMISSIONS, bus
+from core.cache import CACHE_MISS, NEGATIVE, LRUCache
+from core.config import settings
+from core.dataloader import DataLoader
+from core.db_helper import db_helper
+from core.database.bulk import insert_missing_names
+from core.database.counting import CountMode, count_rows, count_statement
+from core.database.export import stream_ndjson
+from core.database.filters import NAME_PARAM, NameMatch, name_filter, name_pattern
+from core.database.importer import ImportFormat, ImportReport, import_names
+from core.database.statements import StatementCache
+from core.pagination import decode_cursor, encode_cursor
+from role.authz import authz_engine
+from role.model import role_permission
 from .model import Permission
 from .schema import (
+    PermissionBulkCreateRequest,
+    PermissionBulkCreateResponse,
     PermissionCreateRequest,
+    PermissionCreateResponse,
     PermissionListRequest,
-    PermissionListResponse,
+)
+
+# Read-through cache for get_permission, shared by all repository instances
+permission_cache = LRUCache.from_config(settings.cache)
+# Per-filter totals for list_permission with count=cached
+permission_counts = LRUCache.counts_from_config(settings.cache)
+# List versions probed on the primary, keyed by bus.catalog_version
+permission_list_versions = LRUCache.counts_from_config(settings.cache)
+
+
+
+async def _load_permission_batch(
+    session: AsyncSession, permission_ids: list[int]
+) -> dict[int, PermissionCreateResponse]:
+    """
+    Loads many permissions with one ``WHERE id IN (...)`` query.
+    """
+    result = await session.scalars(_PERMISSION_BATCH_STMT, {"ids": permission_ids})
+    return {
+        permission.id: PermissionCreateResponse.model_validate(permission)
+        for permission in result
+    }
+
+
+_PERMISSION_BATCH_STMT = select(Permission).where(
+    Permission.id.in_(bindparam("ids", expanding=True))
+)
+
+# List response columns (the PermissionCreateResponse fields), read without ORM objects
+PERMISSION_COLUMNS = [
+    getattr(Permission, field) for field in PermissionCreateResponse.model_fields
+]
+
+# list_permission statements, built once per query shape (filter, paging mode)
+permission_statements = StatementCache("permissions")
+
+
+def _permission_list_stmt(match: NameMatch | None) -> Select:
+    stmt = select(*PERMISSION_COLUMNS)
+    if match is not None:
+        stmt = stmt.where(name_filter(Permission.name, match))
+    return stmt
+
+
+def _permission_count_stmt(match: NameMatch | None) -> Select:
+    return permission_statements.get(
+        ("count", match), lambda: count_statement(_permission_list_stmt(match))
+    )
+
+
+def _permission_version_stmt(match: NameMatch | None, by_ids: bool) -> Select:
+    """
+    Cheap version of a list selection for its ETag: count, latest
+    ``updated_at`` and highest id of the rows the same filter selects.
+    """
+    def build() -> Select:
+        stmt = select(func.count(), func.max(Permission.updated_at), func.max(Permission.id))
+        if by_ids:
+            return stmt.where(Permission.id.in_(bindparam("ids", expanding=True)))
+        if match is not None:
+            stmt = stmt.where(name_filter(Permission.name, match))
+        return stmt
+
+    return permission_statements.get(("version", match, by_ids), build)
+
+
+def _permission_page_stmt(match: NameMatch | None, cursor: bool, after: bool) -> Select:
+    """
+    One page, newest first: ``(created_at, id)`` keyset with ``limit + 1``
+    rows, or limit/offset. All values are bind parameters.
+    """
+    def build() -> Select:
+        stmt = _permission_list_stmt(match)
+        if not cursor:
+            return (
+                # id breaks created_at ties (bulk inserts share now()), same order as the keyset
+                stmt.order_by(desc(Permission.created_at), desc(Permission.id))
+                .offset(bindparam("offset"))
+                .limit(bindparam("limit"))
+            )
+        if after:
+            stmt = stmt.where(
+                tuple_(Permission.created_at, Permission.id)
+                < tuple_(
+                    bindparam("after_created_at", type_=Permission.created_at.type),
+                    bindparam("after_id"),
+                )
+            )
+        return stmt.order_by(
+            desc(Permission.created_at), desc(Permission.id)
+        ).limit(bindparam("limit"))
+
+    return permission_statements.get(("page", match, cursor, after), build)
+
+
+# Coalesces concurrent get_permission misses into one query per loop tick,
+# on the pool the caller's read session is routed to
+permission_loader = DataLoader(
+    _load_permission_batch,
+    name="permissions",
+    bind=db_helper.routed_engine,
+    admit=db_helper.admit_internal,
 )
 
 
+def _drop_permissions(permission_ids: list[int] | None) -> None:
+    """
+    Bus subscriber: drops in-process state derived from the permissions
+    table, for the given ids or entirely.
+    """
+    authz_engine.invalidate()
+    permission_counts.clear()
+    if permission_ids is None:
+        permission_cache.clear()
+        return
+    for permission_id in permission_ids:
+        permission_cache.invalidate(permission_id)
+
+
+bus.subscribe(PERMISSIONS, _drop_permissions)
+
+
+async def _audit_created(rows: list[Row]) -> None:
+    for permission_id, name in rows:
+        await audit_log.record(
+            AuditEntity.permission, permission_id, AuditAction.create, {"name": name}
+        )
+
+
 class PermissionRepository:
     def __init__(self):
         """
@@ -22,15 +170,13 @@ class PermissionRepository:
         self, session: AsyncSession, data: PermissionCreateRequest
     ) -> Permission:
         """
-        Creates a new permission and returns the instance.
+        Creates a new permission with one ``INSERT ... RETURNING``.
         """
-        new_permission = Permission(**data.model_dump())
+        stmt = insert(Permission).values(**data.model_dump()).returning(Permission)
 
         try:
-            session.add(new_permission)
+            new_permission = (await session.execute(stmt)).scalar_one()
             await session.commit()
-            await session.refresh(new_permission)
-            return new_permission
         except IntegrityError:
             await session.rollback()
             raise HTTPException(
@@ -38,100 +184,340 @@ class PermissionRepository:
                 detail=f"Permission with name '{data.name}' already exists.",
             )
 
+        bus.publish(PERMISSIONS, [new_permission.id])
+        await _audit_created([(new_permission.id, new_permission.name)])
+        return new_permission
+
+    async def bulk_create_permissions(
+        self, session: AsyncSession, data: PermissionBulkCreateRequest
+    ) -> PermissionBulkCreateResponse:
+        """
+        Creates all missing permissions in batched upserts and one commit.
+        """
+        try:
+            created = await insert_missing_names(session, Permission, data.names)
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Could not create permissions.",
+            )
+
+        bus.publish(PERMISSIONS, (permission.id for permission in created))
+        await _audit_created([(permission.id, permission.name) for permission in created])
+        created_names = {permission.name for permission in created}
+        return PermissionBulkCreateResponse(
+            created=created,
+            existing=[name for name in data.names if name not in created_names],
+        )
+
+    async def import_permissions(
+        self,
+        session: AsyncSession,
+        chunks: AsyncIterator[bytes],
+        fmt: ImportFormat,
+        batch_size: int,
+    ) -> ImportReport:
+        """
+        Streams permissions from an NDJSON/CSV body, committing per batch.
+        """
+        try:
+            return await import_names(
+                session,
+                Permission,
+                PermissionCreateRequest,
+                chunks,
+                fmt,
+                batch_size=batch_size,
+                on_inserted=_audit_created,
+            )
+        finally:
+            # Some batches may have been committed even if a later one failed
+            bus.publish(PERMISSIONS)
+
     async def get_permission(
         self, session: AsyncSession, permission_id: int
-    ) -> Permission:
+    ) -> PermissionCreateResponse:
         """
         Fetches a single permission by ID or raises 404.
+
+        Served from ``permission_cache`` when possible. Loaded rows and 404s
+        are cached until they expire or a write invalidates them; a result
+        whose key was invalidated while loading, or read from a replica too
+        soon after an invalidation (``settle_time``), is returned but not
+        cached. Misses go through ``permission_loader``, so concurrent
+        lookups share one query.
         """
-        permission = await session.get(Permission, permission_id)
+        cached = permission_cache.get(permission_id)
+        if cached is NEGATIVE:
+            raise self._not_found(permission_id)
+        if cached is not CACHE_MISS:
+            return cached
 
-        if not permission:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Permission {permission_id} not found",
+        generation = permission_cache.generation()
+        snapshot = await permission_loader.load(session, permission_id)
+        settle = db_helper.settle_time(session)
+        if snapshot is None:
+            permission_cache.set_missing(permission_id, generation, settle)
+            raise self._not_found(permission_id)
+
+        permission_cache.set(permission_id, snapshot, generation, settle)
+        return snapshot
+
+    async def get_permissions_by_ids(
+        self, session: AsyncSession, permission_ids: list[int]
+    ) -> list[PermissionCreateResponse]:
+        """
+        Fetches several permissions at once, in the requested order.
+
+        Cached entries are reused and the rest are loaded with a single
+        ``IN`` query through ``permission_loader``; unknown IDs are skipped.
+        """
+        found: dict[int, PermissionCreateResponse] = {}
+        missing: list[int] = []
+        for permission_id in permission_ids:
+            cached = permission_cache.get(permission_id)
+            if cached is CACHE_MISS:
+                missing.append(permission_id)
+            elif cached is not NEGATIVE:
+                found[permission_id] = cached
+
+        if missing:
+            generation = permission_cache.generation()
+            loaded = await asyncio.gather(
+                *(permission_loader.load(session, permission_id) for permission_id in missing)
             )
-        return permission
+            settle = db_helper.settle_time(session)
+            for permission_id, snapshot in zip(missing, loaded):
+                if snapshot is not None:
+                    permission_cache.set(permission_id, snapshot, generation, settle)
+                    found[permission_id] = snapshot
+                else:
+                    permission_cache.set_missing(permission_id, generation, settle)
+
+        return [found[permission_id] for permission_id in permission_ids if permission_id in found]
+
+    @staticmethod
+    def _not_found(permission_id: int) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Permission {permission_id} not found",
+        )
 
     async def list_permission(
         self, session: AsyncSession, data: PermissionListRequest
-    ) -> PermissionListResponse:
+    ) -> dict:
         """
         Returns a paginated list of permissions, newest first.
+
+        With ``ids`` set, returns exactly those permissions instead.
+
+        Offset mode pages by ``page``; cursor mode seeks past the
+        ``(created_at, id)`` key carried by the ``after`` token.
+
+        The result is plain data shaped like ``PermissionListResponse``,
+        built from Core rows without ORM hydration or pydantic validation,
+        ready for ``FastJSONResponse``.
         """
-        # 1. Base query for filtering
-        stmt = select(Permission)
+        if data.ids is not None:
+            permissions = await self.get_permissions_by_ids(session, data.id_list)
+            return {
+                "page": 1,
+                "limit": data.limit,
+                "total": len(permissions),
+                "total_pages": 1 if permissions else 0,
+                "total_mode": CountMode.exact,
+                "next_cursor": None,
+                "permissions": [permission.model_dump() for permission in permissions],
+            }
 
-        if data.name:
-            stmt = stmt.where(Permission.name.ilike(f"%{data.name}%"))
+        # 1. Query shape and parameter values
+        match = data.match if data.name else None
+        params = {NAME_PARAM: name_pattern(data.name, data.match)} if data.name else {}
 
-        # 2. Get total count
-        count_stmt = select(func.count()).select_from(stmt.subquery())
-        total_result = await session.execute(count_stmt)
-        total = total_result.scalar() or 0
+        # 2. Get total count (optional, exact/cached/estimated)
+        total = None
+        total_pages = None
+        total_mode = None
+        if data.include_total:
+            total, total_mode = await count_rows(
+                session,
+                _permission_count_stmt(match),
+                data.count,
+                cache=permission_counts,
+                cache_key=(data.name, data.match),
+                table_name=Permission.__tablename__,
+                filtered=bool(data.name),
+                params=params,
+                settle=db_helper.settle_time(session),
+            )
+            total_pages = (total + data.limit - 1) // data.limit if total > 0 else 0
 
-        # 3. Apply Ordering (Newest First) and Pagination
-        stmt = (
-            stmt.order_by(desc(Permission.created_at))
-            .offset(data.offset)
-            .limit(data.limit)
-        )
+        # 3. Ordering (newest first) and pagination
+        if data.use_cursor:
+            params["limit"] = data.limit + 1
+            if data.after:
+                params["after_created_at"], params["after_id"] = self._decode_cursor(data.after)
+        else:
+            params["limit"] = data.limit
+            params["offset"] = data.offset
+        stmt = _permission_page_stmt(match, data.use_cursor, bool(data.after))
 
-        result = await session.execute(stmt)
-        permissions = result.scalars().all()
+        result = await session.execute(stmt, params)
+        keys = list(result.keys())
+        permissions = result.all()
 
-        # 4. Calculate pagination metadata
-        total_pages = (total + data.limit - 1) // data.limit if total > 0 else 0
+        # 4. Next cursor: one extra row tells us whether another page exists
+        next_cursor = None
+        if data.use_cursor and len(permissions) > data.limit:
+            permissions = permissions[: data.limit]
+            last = permissions[-1]
+            next_cursor = encode_cursor(
+                {"created_at": last.created_at.isoformat(), "id": last.id}
+            )
 
-        return PermissionListResponse(
-            page=data.page,
-            limit=data.limit,
-            total=total,
-            total_pages=total_pages,
-            permissions=permissions,
-        )
+        return {
+            "page": data.page,
+            "limit": data.limit,
+            "total": total,
+            "total_pages": total_pages,
+            "total_mode": total_mode,
+            "next_cursor": next_cursor,
+            "permissions": [dict(zip(keys, permission)) for permission in permissions],
+        }
+
+    async def list_permission_version(
+        self, session: AsyncSession, data: PermissionListRequest
+    ) -> tuple:
+        """
+        Returns a cheap version of the ``list_permission`` selection for
+        its ETag, without reading the page.
+
+        Probes read on the primary are memoized until the catalog changes
+        (``bus.catalog_version``). Replicas are probed every time, so that
+        a lagging replica never pins a stale tag.
+        """
+        by_ids = data.ids is not None
+        match = data.match if data.name and not by_ids else None
+        if by_ids:
+            params = {"ids": data.id_list}
+            key = (bus.catalog_version.value, tuple(data.id_list))
+        else:
+            params = {NAME_PARAM: name_pattern(data.name, data.match)} if match else {}
+            key = (bus.catalog_version.value, data.name, match)
+
+        memoize = session.bind is db_helper.engine
+        if memoize:
+            version = permission_list_versions.get(key)
+            if version is not CACHE_MISS:
+                return version
+        result = await session.execute(_permission_version_stmt(match, by_ids), params)
+        version = tuple(result.one())
+        if memoize:
+            permission_list_versions.set(key, version)
+        return version
+
+    @staticmethod
+    def _decode_cursor(token: str) -> tuple[datetime, int]:
+        try:
+            values = decode_cursor(token)
+            return datetime.fromisoformat(values["created_at"]), int(values["id"])
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor.",
+            )
+
+    def export_permissions(self, session: AsyncSession) -> AsyncIterator[bytes]:
+        """
+        Streams every permission as NDJSON, ordered by ID.
+        """
+        stmt = select(Permission).order_by(Permission.id)
+        return stream_ndjson(session, stmt, PermissionCreateResponse)
 
     async def update_permission(
         self, session: AsyncSession, permission_id: int, data: PermissionCreateRequest
     ) -> Permission:
         """
-        Updates an existing permission's attributes.
+        Updates a permission with one ``UPDATE ... RETURNING``; no returned
+        row means it does not exist.
         """
-        # Fetch existing record using the same session
-        permission = await self.get_permission(session, permission_id)
-
-        # Update attributes dynamically
-        update_data = data.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(permission, key, value)
+        stmt = (
+            update(Permission)
+            .where(Permission.id == permission_id)
+            .values(**data.model_dump(exclude_unset=True))
+            .returning(Permission)
+            # Rows already in the session's identity map take the returned values
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
 
         try:
-            await session.commit()
-            await session.refresh(permission)
-            return permission
+            permission = (await session.execute(stmt)).scalar_one_or_none()
         except IntegrityError:
             await session.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Permission with name '{data.name}' already exists.",
             )
+        if permission is None:
+            permission_cache.set_missing(permission_id)
+            raise self._not_found(permission_id)
+
+        await session.commit()
+        bus.publish(PERMISSIONS, [permission_id])
+        await audit_log.record(
+            AuditEntity.permission,
+            permission_id,
+            AuditAction.update,
+            data.model_dump(mode="json", exclude_unset=True),
+        )
+        return permission
 
     async def delete_permission(self, session: AsyncSession, permission_id: int) -> None:
         """
-        Deletes a permission by ID.
+        Deletes a permission with one statement: its role assignments go in
+        a CTE of the same ``DELETE``. A zero rowcount means it does not exist.
         """
-        # Fetch existing record using the same session
-        permission = await self.get_permission(session, permission_id)
+        unlink = delete(role_permission).where(role_permission.c.permission_id == permission_id)
+        stmt = (
+            delete(Permission)
+            .where(Permission.id == permission_id)
+            .add_cte(unlink.cte("unlinked_roles"))
+            .execution_options(synchronize_session=False)
+        )
 
         try:
-            await session.delete(permission)
-            await session.commit()
+            result = await session.execute(stmt)
         except Exception:
             await session.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Could not delete permission. It may be in use by a role.",
             )
-            
+        if result.rowcount == 0:
+            permission_cache.set_missing(permission_id)
+            raise self._not_found(permission_id)
+
+        await session.commit()
+        bus.publish(PERMISSIONS, [permission_id])
+        await audit_log.record(AuditEntity.permission, permission_id, AuditAction.delete)
+
+
+async def warm_statements(session: AsyncSession) -> None:
+    """
+    Runs the hot read queries once so their SQL is compiled (and, with
+    asyncpg, prepared) before the first request needs it.
+    """
+    repo = PermissionRepository()
+    await _load_permission_batch(session, [0])
+    for data in (
+        PermissionListRequest(limit=1),
+        PermissionListRequest(limit=1, cursor=True),
+        *(PermissionListRequest(limit=1, name="warm", match=match) for match in NameMatch),
+    ):
+        await repo.list_permission(session, data)
+
+
 def get_permission_repo() -> PermissionRepository:
     return PermissionRepository()
\ No newline at end of file
@@ -1,9 +1,20 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.cache import CacheStats
+from core.database.importer import ImportParams, ImportReport
 from core.db_helper import db_helper
-from .repository import PermissionRepository, get_permission_repo
+from core.etag import collection_etag, etag_matches, not_modified, resource_etag
+from core.serialization import FastJSONResponse
+from .repository import (
+    PermissionRepository,
+    get_permission_repo,
+    permission_cache,
+)
 from .schema import (
+    PermissionBulkCreateRequest,
+    PermissionBulkCreateResponse,
     PermissionCreateRequest,
     PermissionCreateResponse,
     PermissionListRequest,
@@ -29,16 +40,74 @@ async def create_permission(
     return await repo.permission_create(session=session, data=data)
 
 
+@router.post(
+    "/bulk",
+    response_model=PermissionBulkCreateResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def bulk_create_permissions(
+    data: PermissionBulkCreateRequest,
+    session: AsyncSession = Depends(db_helper.session_getter),
+    repo: PermissionRepository = Depends(get_permission_repo),
+) -> PermissionBulkCreateResponse:
+    return await repo.bulk_create_permissions(session=session, data=data)
+
+
+@router.post(
+    "/import",
+    response_model=ImportReport,
+)
+async def import_permissions(
+    request: Request,
+    params: ImportParams = Depends(),
+    session: AsyncSession = Depends(db_helper.session_getter),
+    repo: PermissionRepository = Depends(get_permission_repo),
+) -> ImportReport:
+    return await repo.import_permissions(
+        session=session,
+        chunks=request.stream(),
+        fmt=params.format,
+        batch_size=params.batch_size,
+    )
+
+
 @router.get(
     "",
     response_model=PermissionListResponse,
 )
 async def list_permission(
+    request: Request,
     data: PermissionListRequest = Depends(),
-    session: AsyncSession = Depends(db_helper.session_getter),
+    session: AsyncSession = Depends(db_helper.read_session_getter),
     repo: PermissionRepository = Depends(get_permission_repo),
 ):
-    return await repo.list_permission(session=session, data=data)
+    # Tagged from a cheap version probe, so a 304 skips reading the page
+    version = await repo.list_permission_version(session=session, data=data)
+    etag = collection_etag("permission", request, version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    # Already shaped like PermissionListResponse; skip response_model validation
+    payload = await repo.list_permission(session=session, data=data)
+    return FastJSONResponse(payload, headers={"ETag": etag})
+
+
+@router.get("/export")
+async def export_permissions(
+    session: AsyncSession = Depends(db_helper.read_session_getter),
+    repo: PermissionRepository = Depends(get_permission_repo),
+) -> StreamingResponse:
+    return StreamingResponse(
+        repo.export_permissions(session=session),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get(
+    "/cache/stats",
+    response_model=CacheStats,
+)
+async def permission_cache_stats() -> CacheStats:
+    return permission_cache.stats()
 
 
 @router.get(
@@ -47,10 +116,17 @@ async def list_permission(
 )
 async def get_permission(
     permission_id: int,
-    session: AsyncSession = Depends(db_helper.session_getter),
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(db_helper.read_session_getter),
     repo: PermissionRepository = Depends(get_permission_repo),
 ):
-    return await repo.get_permission(session=session, permission_id=permission_id)
+    permission = await repo.get_permission(session=session, permission_id=permission_id)
+    etag = resource_etag("permission", permission.id, permission.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return permission
 
 
 @router.put(
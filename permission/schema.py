@@ -1,7 +1,23 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from datetime import datetime
 from typing import List, Optional
 
+from core.database.counting import CountMode
+from core.database.filters import NameMatch
+
+
+def require_name_list(values: List[str]) -> List[str]:
+    """
+    Type check for ``mode="before"`` validators of name lists, which run
+    before pydantic's own: a bare string would otherwise be iterated
+    character by character.
+    """
+    if not isinstance(values, list):
+        raise ValueError("Must be a list of names")
+    if not all(isinstance(value, str) for value in values):
+        raise ValueError("Every name must be a string")
+    return values
+
 
 class PermissionCreateRequest(BaseModel):
     name: str
@@ -15,16 +31,27 @@ class PermissionCreateRequest(BaseModel):
 
 
 class PermissionCreateResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     name: str
     created_at: datetime
     updated_at: datetime
 
 
+MAX_IDS_PER_REQUEST = 1000
+
+
 class PermissionListRequest(BaseModel):
-    page: int
-    limit: int
+    page: int = 1
+    limit: int = 20
     name: Optional[str] = None
+    match: NameMatch = NameMatch.contains
+    cursor: bool = False
+    after: Optional[str] = None
+    include_total: bool = True
+    count: CountMode = CountMode.exact
+    ids: Optional[str] = None
 
     @field_validator("page", "limit")
     @classmethod
@@ -40,14 +67,55 @@ class PermissionListRequest(BaseModel):
             return None
         return value.strip().lower()
 
+    @field_validator("ids")
+    @classmethod
+    def validate_ids(cls, value: str | None) -> str | None:
+        if value is None:
+            return None
+        parts = [part.strip() for part in value.split(",") if part.strip()]
+        if not parts or not all(part.isascii() and part.isdigit() for part in parts):
+            raise ValueError("ids must be a comma-separated list of integers")
+        if len(parts) > MAX_IDS_PER_REQUEST:
+            raise ValueError(f"At most {MAX_IDS_PER_REQUEST} ids per request")
+        return ",".join(parts)
+
+    @property
+    def id_list(self) -> List[int]:
+        # Duplicates collapse, order is kept
+        return list(dict.fromkeys(int(part) for part in self.ids.split(","))) if self.ids else []
+
     @property
     def offset(self) -> int:
         return (self.page - 1) * self.limit
 
+    @property
+    def use_cursor(self) -> bool:
+        return self.cursor or self.after is not None
+
 
 class PermissionListResponse(BaseModel):
     page: int
     limit: int
-    total: int
-    total_pages: int
+    total: Optional[int] = None
+    total_pages: Optional[int] = None
+    total_mode: Optional[CountMode] = None
+    next_cursor: Optional[str] = None
     permissions: List[PermissionCreateResponse]
+
+
+class PermissionBulkCreateRequest(BaseModel):
+    names: List[str] = Field(min_length=1, max_length=10_000)
+
+    @field_validator("names", mode="before")
+    @classmethod
+    def normalize_names(cls, values: List[str]) -> List[str]:
+        # Same rules as a single create; duplicates collapse, order is kept
+        normalized = [
+            PermissionCreateRequest.normalize_name(value) for value in require_name_list(values)
+        ]
+        return list(dict.fromkeys(normalized))
+
+
+class PermissionBulkCreateResponse(BaseModel):
+    created: List[PermissionCreateResponse]
+    existing: List[str]
@@ -0,0 +1,129 @@
+import asyncio
+from typing import Awaitable, Callable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from core.database.consistency import snapshot_connection
+from core.db_helper import db_helper
+from permission.model import Permission
+from .model import Role, role_closure, role_permission
+
+
+class AuthorizationEngine:
+    """
+    In-memory compiled view of the role -> permission graph.
+
+    Every permission name gets a dense integer index and every role is kept
+    as a bitset (a plain ``int``) over those indexes, so answering
+    "does role X have permission Y" is two dict lookups and one bit test.
+
+    The graph is read from ``bind()`` when given, otherwise from the engine
+    of the session passed in, under a slot from ``admit(engine, "authz")``
+    when given: the rebuild uses a connection of its own.
+    """
+
+    def __init__(
+        self,
+        bind: Callable[[], AsyncEngine] | None = None,
+        admit: Callable[[AsyncEngine, str], Awaitable[Callable[[], None]]] | None = None,
+    ) -> None:
+        self.bind = bind
+        self.admit = admit
+        self._permission_index: dict[str, int] = {}
+        self._role_bits: dict[int, int] = {}
+        self._generation = 0
+        self._loaded_generation = -1
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded_generation == self._generation
+
+    def invalidate(self) -> None:
+        """
+        Marks the compiled graph as stale; it is rebuilt on the next check.
+        """
+        self._generation += 1
+
+    async def ensure_loaded(self, session: AsyncSession) -> None:
+        if self.is_loaded:
+            return
+        async with self._lock:
+            if not self.is_loaded:
+                await self.rebuild(session)
+
+    async def rebuild(self, session: AsyncSession) -> None:
+        """
+        Loads the whole graph in four queries and swaps it in atomically.
+
+        The queries share one snapshot (``snapshot_connection``), so a
+        grant or closure row always refers to a role and permission read
+        by the same rebuild, however writers commit in between. A role's
+        bitset includes the permissions of every role it inherits from,
+        read from the transitive-closure table, so checks never walk the
+        hierarchy.
+        """
+        generation = self._generation
+
+        permission_index: dict[str, int] = {}
+        engine = self.bind() if self.bind is not None else session.bind
+        release = await self.admit(engine, "authz") if self.admit is not None else None
+        try:
+            role_bits = await self._read_graph(engine, permission_index)
+        finally:
+            if release is not None:
+                release()
+
+        self._permission_index = permission_index
+        self._role_bits = role_bits
+        self._loaded_generation = generation
+
+    @staticmethod
+    async def _read_graph(engine: AsyncEngine, permission_index: dict[str, int]) -> dict[int, int]:
+        index_by_id: dict[int, int] = {}
+        async with snapshot_connection(engine) as connection:
+            permissions = await connection.execute(
+                select(Permission.id, Permission.name).order_by(Permission.id)
+            )
+            for permission_id, name in permissions:
+                index_by_id[permission_id] = permission_index[name] = len(permission_index)
+
+            role_ids = await connection.scalars(select(Role.id))
+            role_bits: dict[int, int] = dict.fromkeys(role_ids, 0)
+
+            links = await connection.execute(
+                select(role_permission.c.role_id, role_permission.c.permission_id)
+            )
+            for role_id, permission_id in links:
+                role_bits[role_id] |= 1 << index_by_id[permission_id]
+
+            inherited = dict(role_bits)
+            closure = await connection.execute(
+                select(role_closure.c.ancestor_id, role_closure.c.descendant_id)
+            )
+            for ancestor_id, descendant_id in closure:
+                inherited[ancestor_id] |= role_bits[descendant_id]
+        return inherited
+
+    def has_role(self, role_id: int) -> bool:
+        return role_id in self._role_bits
+
+    def check(self, role_id: int, permission: str) -> bool:
+        """
+        Returns whether the role holds the permission.
+
+        Raises ``KeyError`` if the role is unknown.
+        """
+        bits = self._role_bits[role_id]
+        index = self._permission_index.get(permission)
+        if index is None:
+            return False
+        return bool(bits >> index & 1)
+
+
+# Rebuilt from the primary: a lagging replica would keep serving revoked
+# permissions until the next invalidation
+authz_engine = AuthorizationEngine(
+    bind=lambda: db_helper.engine, admit=db_helper.admit_internal
+)
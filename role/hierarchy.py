@@ -0,0 +1,67 @@
+from sqlalchemy import Delete, Insert, Update, literal, select, true, tuple_, union_all
+from sqlalchemy.dialects.postgresql import insert
+
+from .model import role_closure
+
+# Ключ advisory-блокировки, сериализующей изменения иерархии (PostgreSQL)
+HIERARCHY_LOCK_KEY = 0x524F4C45
+
+
+def _path_product(parent_id: int, child_id: int):
+    """
+    Пары (ancestor, descendant), которые соединяет ребро parent -> child,
+    с числом путей через это ребро: предки parent (включая его самого)
+    x потомки child (включая его самого).
+    """
+    ancestors = union_all(
+        select(role_closure.c.ancestor_id.label("role_id"), role_closure.c.paths)
+        .where(role_closure.c.descendant_id == parent_id),
+        select(literal(parent_id).label("role_id"), literal(1).label("paths")),
+    ).subquery("ancestors")
+    descendants = union_all(
+        select(role_closure.c.descendant_id.label("role_id"), role_closure.c.paths)
+        .where(role_closure.c.ancestor_id == child_id),
+        select(literal(child_id).label("role_id"), literal(1).label("paths")),
+    ).subquery("descendants")
+
+    return select(
+        ancestors.c.role_id.label("ancestor_id"),
+        descendants.c.role_id.label("descendant_id"),
+        (ancestors.c.paths * descendants.c.paths).label("paths"),
+    ).join_from(ancestors, descendants, true())
+
+
+def closure_add_stmt(parent_id: int, child_id: int) -> Insert:
+    """Добавление путей нового ребра в замыкание одним INSERT ... ON CONFLICT."""
+    stmt = insert(role_closure).from_select(
+        ["ancestor_id", "descendant_id", "paths"],
+        _path_product(parent_id, child_id),
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[role_closure.c.ancestor_id, role_closure.c.descendant_id],
+        set_={"paths": role_closure.c.paths + stmt.excluded.paths},
+    )
+
+
+def closure_remove_stmts(parent_id: int, child_id: int) -> tuple[Update, Delete]:
+    """
+    Вычитание путей удаляемого ребра и удаление пар, у которых путей не осталось.
+    Выполнять по порядку, до удаления самого ребра это не зависит.
+    """
+    product = _path_product(parent_id, child_id).subquery("removed")
+    decrement = (
+        role_closure.update()
+        .where(
+            role_closure.c.ancestor_id == product.c.ancestor_id,
+            role_closure.c.descendant_id == product.c.descendant_id,
+        )
+        .values(paths=role_closure.c.paths - product.c.paths)
+    )
+    pairs = _path_product(parent_id, child_id).subquery("pairs")
+    cleanup = role_closure.delete().where(
+        role_closure.c.paths <= 0,
+        tuple_(role_closure.c.ancestor_id, role_closure.c.descendant_id).in_(
+            select(pairs.c.ancestor_id, pairs.c.descendant_id)
+        ),
+    )
+    return decrement, cleanup
@@ -1,12 +1,57 @@
-from typing import List
+from typing import List, TYPE_CHECKING
 from datetime import datetime
-from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, Table, func
 
 from core.database.base import Base
 
+if TYPE_CHECKING:
+    from permission.model import Permission
+
+
+role_permission = Table(
+    "role_permission",
+    Base.metadata,
+    Column("role_id", ForeignKey("roles.id"), primary_key=True),
+    Column("permission_id", ForeignKey("permissions.id"), primary_key=True),
+)
+
+# Прямые ребра иерархии: родитель наследует права дочерней роли (admin -> editor -> viewer)
+role_hierarchy = Table(
+    "role_hierarchy",
+    Base.metadata,
+    Column("parent_id", ForeignKey("roles.id"), primary_key=True),
+    Column("child_id", ForeignKey("roles.id"), primary_key=True),
+    Index("ix_role_hierarchy_child_id", "child_id"),
+)
+
+# Транзитивное замыкание иерархии: строка (ancestor, descendant) для каждой пары
+# ролей, связанных путем длины >= 1; paths - число различных путей, нужно для
+# корректного удаления ребер в DAG
+role_closure = Table(
+    "role_closure",
+    Base.metadata,
+    Column("ancestor_id", ForeignKey("roles.id"), primary_key=True),
+    Column("descendant_id", ForeignKey("roles.id"), primary_key=True),
+    Column("paths", Integer, nullable=False),
+    Index("ix_role_closure_descendant_id", "descendant_id"),
+)
+
 class Role(Base):
     __tablename__ = "roles"
+    __table_args__ = (
+        Index(
+            "ix_roles_name_pattern",
+            "name",
+            postgresql_ops={"name": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_roles_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(unique=True, nullable=False)
@@ -31,9 +76,8 @@ class Role(Base):
     #     back_populates="roles"
     # )
     
-    # # Исправлено имя связи на plural (permissions) и back_populates
-    # permissions: Mapped[List["Permission"]] = relationship(
-    #     "Permission",
-    #     secondary="role_permission",
-    #     back_populates="roles" # Проверьте, что в Permission это поле называется 'roles'
-    # )
\ No newline at end of file
+    permissions: Mapped[List["Permission"]] = relationship(
+        "Permission",
+        secondary="role_permission",
+        back_populates="roles"
+    )
\ No newline at end of file
@@ -1,14 +1,150 @@
+import asyncio
 from math import ceil
+from typing import AsyncIterator
 
-from sqlalchemy import insert, select, func
+from sqlalchemy import Row, Select, bindparam, delete, exists, func, insert, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
 from fastapi import HTTPException, status
 
+from audit.queue import audit_log
+from audit.schema import AuditAction, AuditEntity
+from core.bus import ROLE_GRANTS, ROLES, bus
+from core.cache import CACHE_MISS, NEGATIVE, LRUCache
+from core.config import settings
+from core.dataloader import DataLoader
+from core.db_helper import db_helper
 from core.logging import logging
-from .schema import RoleCreateRequest, RoleListRequest, RoleListResponse
-from .model import Role
+from core.database.bulk import insert_missing_names
+from core.database.counting import CountMode, count_rows, count_statement
+from core.database.export import stream_ndjson
+from core.database.filters import NAME_PARAM, NameMatch, name_filter, name_pattern
+from core.database.importer import ImportFormat, ImportReport, import_names
+from core.database.statements import StatementCache
+from core.pagination import decode_cursor, encode_cursor
+from .authz import authz_engine
+from .hierarchy import HIERARCHY_LOCK_KEY, closure_add_stmt, closure_remove_stmts
+from .schema import (
+    RoleBulkCreateRequest,
+    RoleBulkCreateResponse,
+    RoleCreateRequest,
+    RoleCreateResponse,
+    RoleEffectivePermissionsResponse,
+    RoleHierarchyResponse,
+    RoleListRequest,
+    RolePermissionCheckRequest,
+    RolePermissionCheckResponse,
+    RolePermissionsPatchRequest,
+    RolePermissionsResponse,
+    RolePermissionsSetRequest,
+)
+from permission.model import Permission
+from permission.schema import PermissionCreateResponse
+from .model import Role, role_closure, role_hierarchy, role_permission
+
+# Read-through кэш для get_role, общий для всех экземпляров репозитория
+role_cache = LRUCache.from_config(settings.cache)
+# Кэш количества строк по фильтрам для list_role с count=cached
+role_counts = LRUCache.counts_from_config(settings.cache)
+# Версии выборок list_role для ETag, снятые с primary; ключ включает bus.catalog_version
+role_list_versions = LRUCache.counts_from_config(settings.cache)
+
+
+
+async def _load_role_batch(
+    session: AsyncSession, role_ids: list[int]
+) -> dict[int, RoleCreateResponse]:
+    """Загрузка нескольких ролей одним запросом WHERE id IN (...)."""
+    result = await session.scalars(_ROLE_BATCH_STMT, {"ids": role_ids})
+    return {role.id: RoleCreateResponse.model_validate(role) for role in result}
+
+
+_ROLE_BATCH_STMT = select(Role).where(Role.id.in_(bindparam("ids", expanding=True)))
+
+# Колонки ответа списка (поля RoleCreateResponse) для чтения без ORM-объектов
+ROLE_COLUMNS = [getattr(Role, field) for field in RoleCreateResponse.model_fields]
+
+# Выражения list_role, собранные один раз на форму запроса (фильтр, пагинация)
+role_statements = StatementCache("roles")
+
+
+def _role_list_stmt(match: NameMatch | None) -> Select:
+    stmt = select(*ROLE_COLUMNS)
+    if match is not None:
+        stmt = stmt.where(name_filter(Role.name, match))
+    return stmt
+
+
+def _role_count_stmt(match: NameMatch | None) -> Select:
+    return role_statements.get(("count", match), lambda: count_statement(_role_list_stmt(match)))
+
+
+def _role_version_stmt(match: NameMatch | None, by_ids: bool) -> Select:
+    """Версия выборки для ETag: count, max(updated_at), max(id) по тому же фильтру."""
+    def build() -> Select:
+        stmt = select(func.count(), func.max(Role.updated_at), func.max(Role.id))
+        if by_ids:
+            return stmt.where(Role.id.in_(bindparam("ids", expanding=True)))
+        if match is not None:
+            stmt = stmt.where(name_filter(Role.name, match))
+        return stmt
+
+    return role_statements.get(("version", match, by_ids), build)
+
+
+def _role_page_stmt(match: NameMatch | None, cursor: bool, after: bool) -> Select:
+    """Страница: keyset по id (limit+1 строк) или limit/offset; значения - bind-параметры."""
+    def build() -> Select:
+        stmt = _role_list_stmt(match)
+        if not cursor:
+            return stmt.order_by(Role.id).limit(bindparam("limit")).offset(bindparam("offset"))
+        if after:
+            stmt = stmt.where(Role.id > bindparam("after_id"))
+        return stmt.order_by(Role.id).limit(bindparam("limit"))
+
+    return role_statements.get(("page", match, cursor, after), build)
+
+
+# Склеивает одновременные промахи get_role в один запрос за тик event loop,
+# на том пуле, куда маршрутизирована read-сессия вызывающего
+role_loader = DataLoader(
+    _load_role_batch,
+    name="roles",
+    bind=db_helper.routed_engine,
+    admit=db_helper.admit_internal,
+)
+
+
+def _drop_roles(role_ids: list[int] | None) -> None:
+    """Подписчик шины: сброс состояния в памяти, зависящего от таблицы ролей."""
+    authz_engine.invalidate()
+    role_counts.clear()
+    if role_ids is None:
+        role_cache.clear()
+        return
+    for role_id in role_ids:
+        role_cache.invalidate(role_id)
+
+
+def _drop_grants(role_ids: list[int] | None) -> None:
+    """Подписчик шины: изменились права ролей или иерархия."""
+    authz_engine.invalidate()
+
+
+bus.subscribe(ROLES, _drop_roles)
+bus.subscribe(ROLE_GRANTS, _drop_grants)
+
+
+async def _audit_created(rows: list[Row]) -> None:
+    """Аудит созданных ролей: строки (id, name) после commit."""
+    for role_id, name in rows:
+        await audit_log.record(AuditEntity.role, role_id, AuditAction.create, {"name": name})
+
+
+async def _audit_role_update(role_id: int, changes: dict) -> None:
+    await audit_log.record(AuditEntity.role, role_id, AuditAction.update, changes)
 
 class UserRepository:
     def __init__(self):
@@ -21,7 +157,10 @@ class UserRepository:
         try:
             result = await session.execute(stmt)
             await session.commit()
-            return result.scalar_one()
+            role = result.scalar_one()
+            bus.publish(ROLES, [role.id])
+            await _audit_created([(role.id, role.name)])
+            return role
             
         except IntegrityError as e:
             await session.rollback()
@@ -31,20 +170,61 @@ class UserRepository:
                 detail="Role with these unique constraints already exists."
             ) from e
 
-    async def get_role(self, session: AsyncSession, role_id: int) -> Role:
-        """Получение одной роли по ID или 404."""
+    async def bulk_create_roles(
+        self, session: AsyncSession, data: RoleBulkCreateRequest
+    ) -> RoleBulkCreateResponse:
+        """Пакетное создание ролей: upsert батчами и один commit."""
         try:
-            role = await session.get(Role, role_id)
-            
-            if role is None:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Role with id {role_id} not found"
-                )
-            
-            return role
+            created = await insert_missing_names(session, Role, data.names)
+            await session.commit()
+        except IntegrityError as e:
+            await session.rollback()
+            logging.error(f"Integrity error during bulk role creation: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Could not create roles."
+            ) from e
+
+        bus.publish(ROLES, (role.id for role in created))
+        await _audit_created([(role.id, role.name) for role in created])
+        created_names = {role.name for role in created}
+        return RoleBulkCreateResponse(
+            created=created,
+            existing=[name for name in data.names if name not in created_names]
+        )
+
+    async def import_roles(
+        self,
+        session: AsyncSession,
+        chunks: AsyncIterator[bytes],
+        fmt: ImportFormat,
+        batch_size: int
+    ) -> ImportReport:
+        """Потоковый импорт ролей из NDJSON/CSV с commit на каждый батч."""
+        try:
+            return await import_names(
+                session, Role, RoleCreateRequest, chunks, fmt,
+                batch_size=batch_size, on_inserted=_audit_created
+            )
+        finally:
+            # Часть батчей могла быть зафиксирована даже при ошибке
+            bus.publish(ROLES)
+
+    async def get_role(self, session: AsyncSession, role_id: int) -> RoleCreateResponse:
+        """Получение одной роли по ID или 404 (кэш, затем батч через role_loader)."""
+        cached = role_cache.get(role_id)
+        if cached is NEGATIVE:
+            raise self._not_found(role_id)
+        if cached is not CACHE_MISS:
+            return cached
 
+        # Результат не кэшируется, если роль инвалидировали во время загрузки
+        # (или, для реплики, незадолго до нее - см. settle_time)
+        generation = role_cache.generation()
+        try:
+            snapshot = await role_loader.load(session, role_id)
         except HTTPException:
+            # 503 от admission: слот запроса или батча
             raise
         except Exception as e:
             logging.error(f"Unexpected error fetching role {role_id}: {e}")
@@ -53,35 +233,128 @@ class UserRepository:
                 detail="Internal server error"
             )
 
-    async def list_role(self, session: AsyncSession, data: RoleListRequest) -> RoleListResponse:
-        """Получение списка ролей с фильтрацией и пагинацией."""
+        settle = db_helper.settle_time(session)
+        if snapshot is None:
+            role_cache.set_missing(role_id, generation, settle)
+            raise self._not_found(role_id)
+
+        role_cache.set(role_id, snapshot, generation, settle)
+        return snapshot
+
+    async def get_roles_by_ids(
+        self, session: AsyncSession, role_ids: list[int]
+    ) -> list[RoleCreateResponse]:
+        """Получение нескольких ролей одним IN-запросом (кэш, затем role_loader), в порядке запроса."""
+        found: dict[int, RoleCreateResponse] = {}
+        missing: list[int] = []
+        for role_id in role_ids:
+            cached = role_cache.get(role_id)
+            if cached is CACHE_MISS:
+                missing.append(role_id)
+            elif cached is not NEGATIVE:
+                found[role_id] = cached
+
+        if missing:
+            generation = role_cache.generation()
+            loaded = await asyncio.gather(*(role_loader.load(session, role_id) for role_id in missing))
+            settle = db_helper.settle_time(session)
+            for role_id, snapshot in zip(missing, loaded):
+                if snapshot is not None:
+                    role_cache.set(role_id, snapshot, generation, settle)
+                    found[role_id] = snapshot
+                else:
+                    role_cache.set_missing(role_id, generation, settle)
+
+        return [found[role_id] for role_id in role_ids if role_id in found]
+
+    @staticmethod
+    def _in_hierarchy(role_id: int) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=(
+                f"Cannot delete role {role_id}: it is part of the role hierarchy. "
+                f"Remove its parent and child links first."
+            ),
+        )
+
+    @staticmethod
+    def _not_found(role_id: int) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Role with id {role_id} not found"
+        )
+
+    async def list_role(self, session: AsyncSession, data: RoleListRequest) -> dict:
+        """
+        Получение списка ролей с фильтрацией и пагинацией (offset или курсор) либо по ids.
+        Возвращает готовые к JSON данные в форме RoleListResponse: строки Core без ORM и pydantic.
+        """
         try:
-            # 1. Базовый запрос
-            base_stmt = select(Role)
-            if data.name:
-                base_stmt = base_stmt.where(Role.name.ilike(f"%{data.name}%"))
+            if data.ids is not None:
+                roles = await self.get_roles_by_ids(session, data.id_list)
+                return {
+                    "page": 1,
+                    "limit": data.limit,
+                    "total": len(roles),
+                    "total_pages": 1 if roles else 0,
+                    "total_mode": CountMode.exact,
+                    "next_cursor": None,
+                    "roles": [role.model_dump() for role in roles],
+                }
 
-            # 2. Подсчет общего количества через подзапрос (subquery)
-            count_stmt = select(func.count()).select_from(base_stmt.subquery())
-            total_result = await session.execute(count_stmt)
-            total = total_result.scalar() or 0
+            # 1. Форма запроса и значения параметров
+            match = data.match if data.name else None
+            params = {NAME_PARAM: name_pattern(data.name, data.match)} if data.name else {}
 
-            # 3. Получение данных с лимитом и смещением
-            data_stmt = base_stmt.order_by(Role.id).limit(data.limit).offset(data.offset)
-            result = await session.execute(data_stmt)
-            roles = result.scalars().all()
+            # 2. Подсчет общего количества: exact / cached / estimated (можно пропустить)
+            total = None
+            total_pages = None
+            total_mode = None
+            if data.include_total:
+                total, total_mode = await count_rows(
+                    session,
+                    _role_count_stmt(match),
+                    data.count,
+                    cache=role_counts,
+                    cache_key=(data.name, data.match),
+                    table_name=Role.__tablename__,
+                    filtered=bool(data.name),
+                    params=params,
+                    settle=db_helper.settle_time(session),
+                )
+                total_pages = ceil(total / data.limit) if total > 0 else 0
 
-            # 4. Расчет страниц
-            total_pages = ceil(total / data.limit) if total > 0 else 0
+            # 3. Получение данных: keyset по id или лимит со смещением
+            if data.use_cursor:
+                params["limit"] = data.limit + 1
+                if data.after:
+                    params["after_id"] = self._decode_cursor(data.after)
+            else:
+                params["limit"] = data.limit
+                params["offset"] = data.offset
+            data_stmt = _role_page_stmt(match, data.use_cursor, bool(data.after))
+            result = await session.execute(data_stmt, params)
+            keys = list(result.keys())
+            roles = result.all()
 
-            return RoleListResponse(
-                page=data.page,
-                limit=data.limit,
-                total=total,
-                total_pages=total_pages,
-                roles=roles
-            )
+            # 4. Курсор следующей страницы (лишняя строка = есть продолжение)
+            next_cursor = None
+            if data.use_cursor and len(roles) > data.limit:
+                roles = roles[:data.limit]
+                next_cursor = encode_cursor({"id": roles[-1].id})
 
+            return {
+                "page": data.page,
+                "limit": data.limit,
+                "total": total,
+                "total_pages": total_pages,
+                "total_mode": total_mode,
+                "next_cursor": next_cursor,
+                "roles": [dict(zip(keys, role)) for role in roles],
+            }
+
+        except HTTPException:
+            raise
         except Exception as e:
             logging.error(f"Error fetching roles list: {e}")
             raise HTTPException(
@@ -89,19 +362,74 @@ class UserRepository:
                 detail="Error retrieving roles from database"
             )
 
+    async def list_role_version(self, session: AsyncSession, data: RoleListRequest) -> tuple:
+        """
+        Дешевая версия выборки list_role для ETag, без чтения страницы.
+        С primary результат запоминается до следующего изменения каталога
+        (bus.catalog_version); реплика опрашивается каждый раз, чтобы отстающая
+        реплика не закрепила устаревший тег.
+        """
+        by_ids = data.ids is not None
+        match = data.match if data.name and not by_ids else None
+        if by_ids:
+            params = {"ids": data.id_list}
+            key = (bus.catalog_version.value, tuple(data.id_list))
+        else:
+            params = {NAME_PARAM: name_pattern(data.name, data.match)} if match else {}
+            key = (bus.catalog_version.value, data.name, match)
+
+        memoize = session.bind is db_helper.engine
+        if memoize:
+            version = role_list_versions.get(key)
+            if version is not CACHE_MISS:
+                return version
+        try:
+            result = await session.execute(_role_version_stmt(match, by_ids), params)
+        except Exception as e:
+            logging.error(f"Error probing roles list version: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error retrieving roles from database"
+            )
+        version = tuple(result.one())
+        if memoize:
+            role_list_versions.set(key, version)
+        return version
+
+    @staticmethod
+    def _decode_cursor(token: str) -> int:
+        try:
+            return int(decode_cursor(token)["id"])
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor."
+            )
+
+    def export_roles(self, session: AsyncSession) -> AsyncIterator[bytes]:
+        """Потоковая выгрузка всех ролей в NDJSON, по возрастанию ID."""
+        stmt = select(Role).order_by(Role.id)
+        return stream_ndjson(session, stmt, RoleCreateResponse)
+
     async def update_role(self, session: AsyncSession, role_id: int, data: RoleCreateRequest) -> Role:
-        """Обновление существующей роли."""
+        """Обновление роли одним UPDATE ... RETURNING; 404, если строка не найдена."""
+        stmt = (
+            update(Role)
+            .where(Role.id == role_id)
+            .values(**data.model_dump())
+            .returning(Role)
+            # Объект, уже загруженный в сессию, получает значения из RETURNING
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
         try:
-            # Используем get_role для получения объекта и проверки на 404
-            role = await self.get_role(session, role_id)
-            
-            # Обновляем поля
-            update_data = data.model_dump()
-            for key, value in update_data.items():
-                setattr(role, key, value)
-            
+            role = (await session.execute(stmt)).scalar_one_or_none()
+            if role is None:
+                role_cache.set_missing(role_id)
+                raise self._not_found(role_id)
+
             await session.commit()
-            await session.refresh(role)
+            bus.publish(ROLES, [role_id])
+            await _audit_role_update(role_id, data.model_dump(mode="json"))
             return role
 
         except IntegrityError as e:
@@ -122,21 +450,44 @@ class UserRepository:
             )
 
     async def delete_role(self, session: AsyncSession, role_id: int) -> bool:
-        """Удаление роли."""
+        """
+        Удаление роли одним запросом: связи с правами удаляются в CTE того же
+        DELETE (как раньше делал ORM). Роль, входящая в иерархию, не удаляется
+        вовсе (ни связи, ни сама роль): молча разорвать ребра значило бы
+        отнять у родителей унаследованные права. 409 с указанием на иерархию,
+        404 - по rowcount.
+        """
+        in_hierarchy = exists().where(
+            or_(role_hierarchy.c.parent_id == role_id, role_hierarchy.c.child_id == role_id)
+        )
+        unlink = delete(role_permission).where(
+            role_permission.c.role_id == role_id, ~in_hierarchy
+        )
+        stmt = (
+            delete(Role)
+            .where(Role.id == role_id, ~in_hierarchy)
+            .add_cte(unlink.cte("unlinked_permissions"))
+            .execution_options(synchronize_session=False)
+        )
         try:
-            role = await self.get_role(session, role_id)
-            
-            await session.delete(role)
+            result = await session.execute(stmt)
+            if result.rowcount == 0:
+                await session.rollback()
+                if await session.scalar(select(in_hierarchy)):
+                    raise self._in_hierarchy(role_id)
+                role_cache.set_missing(role_id)
+                raise self._not_found(role_id)
+
             await session.commit()
+            bus.publish(ROLES, [role_id])
+            await audit_log.record(AuditEntity.role, role_id, AuditAction.delete)
             return True
 
         except IntegrityError as e:
+            # Остаются только ссылки иерархии, добавленные параллельно
             await session.rollback()
             logging.error(f"Foreign key constraint error on delete role {role_id}: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cannot delete role: it is currently in use."
-            )
+            raise self._in_hierarchy(role_id)
         except HTTPException:
             raise
         except Exception as e:
@@ -146,6 +497,312 @@ class UserRepository:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Internal server error during deletion"
             )
-            
+
+    async def check_permission(
+        self, session: AsyncSession, role_id: int, data: RolePermissionCheckRequest
+    ) -> RolePermissionCheckResponse:
+        """Проверка наличия права у роли по скомпилированному графу в памяти."""
+        await authz_engine.ensure_loaded(session)
+
+        if not authz_engine.has_role(role_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Role with id {role_id} not found"
+            )
+
+        return RolePermissionCheckResponse(
+            role_id=role_id,
+            permission=data.permission,
+            allowed=authz_engine.check(role_id, data.permission),
+        )
+
+    async def set_role_permissions(
+        self, session: AsyncSession, role_id: int, data: RolePermissionsSetRequest
+    ) -> RolePermissionsResponse:
+        """Замена набора прав роли: diff с текущим набором, один INSERT и один DELETE."""
+        try:
+            await self._lock_role(session, role_id)
+            desired = await self._resolve_permission_ids(
+                session, data.permission_ids, data.permission_names
+            )
+            current = set(await session.scalars(
+                select(role_permission.c.permission_id)
+                .where(role_permission.c.role_id == role_id)
+            ))
+
+            to_add = desired - current
+            to_remove = current - desired
+            if to_add:
+                await session.execute(
+                    insert(role_permission),
+                    [{"role_id": role_id, "permission_id": pid} for pid in to_add]
+                )
+            if to_remove:
+                await session.execute(
+                    delete(role_permission).where(
+                        role_permission.c.role_id == role_id,
+                        role_permission.c.permission_id.in_(to_remove)
+                    )
+                )
+            await session.commit()
+
+        except HTTPException:
+            await session.rollback()
+            raise
+        except Exception as e:
+            await session.rollback()
+            logging.error(f"Unexpected error setting permissions of role {role_id}: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Internal server error during permission assignment"
+            )
+
+        if to_add or to_remove:
+            bus.publish(ROLE_GRANTS, [role_id])
+            await _audit_role_update(role_id, {
+                "permissions_added": sorted(to_add),
+                "permissions_removed": sorted(to_remove),
+            })
+        return RolePermissionsResponse(
+            role_id=role_id,
+            added=len(to_add),
+            removed=len(to_remove),
+            permission_ids=sorted(desired)
+        )
+
+    async def patch_role_permissions(
+        self, session: AsyncSession, role_id: int, data: RolePermissionsPatchRequest
+    ) -> RolePermissionsResponse:
+        """Добавление/удаление прав роли дельтой, в одной транзакции."""
+        try:
+            await self._lock_role(session, role_id)
+            to_add = await self._resolve_permission_ids(session, data.add_ids, data.add_names)
+            to_remove = await self._resolve_permission_ids(
+                session, data.remove_ids, data.remove_names
+            )
+            if to_add & to_remove:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="The same permission cannot be added and removed at once."
+                )
+
+            added = removed = 0
+            if to_add:
+                result = await session.execute(
+                    pg_insert(role_permission)
+                    .values([{"role_id": role_id, "permission_id": pid} for pid in to_add])
+                    .on_conflict_do_nothing()
+                )
+                added = result.rowcount
+            if to_remove:
+                result = await session.execute(
+                    delete(role_permission).where(
+                        role_permission.c.role_id == role_id,
+                        role_permission.c.permission_id.in_(to_remove)
+                    )
+                )
+                removed = result.rowcount
+
+            permission_ids = list(await session.scalars(
+                select(role_permission.c.permission_id)
+                .where(role_permission.c.role_id == role_id)
+                .order_by(role_permission.c.permission_id)
+            ))
+            await session.commit()
+
+        except HTTPException:
+            await session.rollback()
+            raise
+        except Exception as e:
+            await session.rollback()
+            logging.error(f"Unexpected error patching permissions of role {role_id}: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Internal server error during permission assignment"
+            )
+
+        if added or removed:
+            bus.publish(ROLE_GRANTS, [role_id])
+            # Запрошенная дельта: часть прав могла уже быть (или отсутствовать) у роли
+            await _audit_role_update(role_id, {
+                "permissions_added": sorted(to_add),
+                "permissions_removed": sorted(to_remove),
+            })
+        return RolePermissionsResponse(
+            role_id=role_id,
+            added=added,
+            removed=removed,
+            permission_ids=permission_ids
+        )
+
+    async def add_child_role(
+        self, session: AsyncSession, parent_id: int, child_id: int
+    ) -> RoleHierarchyResponse:
+        """Добавление ребра parent -> child с инкрементальным обновлением замыкания."""
+        if parent_id == child_id:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A role cannot inherit from itself."
+            )
+        try:
+            await self._lock_hierarchy(session)
+            found = set(await session.scalars(
+                select(Role.id).where(Role.id.in_([parent_id, child_id]))
+            ))
+            for role_id in (parent_id, child_id):
+                if role_id not in found:
+                    raise self._not_found(role_id)
+
+            # Цикл: parent уже достижим из child
+            cycle = await session.scalar(
+                select(role_closure.c.paths).where(
+                    role_closure.c.ancestor_id == child_id,
+                    role_closure.c.descendant_id == parent_id
+                )
+            )
+            if cycle is not None:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Role {child_id} already inherits from role {parent_id}: edge would create a cycle."
+                )
+
+            result = await session.execute(
+                pg_insert(role_hierarchy)
+                .values(parent_id=parent_id, child_id=child_id)
+                .on_conflict_do_nothing()
+            )
+            if result.rowcount == 0:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Role {parent_id} already inherits from role {child_id}."
+                )
+            await session.execute(closure_add_stmt(parent_id, child_id))
+            await session.commit()
+
+        except HTTPException:
+            await session.rollback()
+            raise
+        except Exception as e:
+            await session.rollback()
+            logging.error(f"Unexpected error linking role {parent_id} -> {child_id}: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Internal server error during hierarchy update"
+            )
+
+        bus.publish(ROLE_GRANTS, [parent_id, child_id])
+        await _audit_role_update(parent_id, {"child_added": child_id})
+        return RoleHierarchyResponse(parent_id=parent_id, child_id=child_id)
+
+    async def remove_child_role(self, session: AsyncSession, parent_id: int, child_id: int) -> None:
+        """Удаление ребра parent -> child; пары без оставшихся путей уходят из замыкания."""
+        try:
+            await self._lock_hierarchy(session)
+            result = await session.execute(
+                delete(role_hierarchy).where(
+                    role_hierarchy.c.parent_id == parent_id,
+                    role_hierarchy.c.child_id == child_id
+                )
+            )
+            if result.rowcount == 0:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Role {parent_id} does not inherit from role {child_id}"
+                )
+            for stmt in closure_remove_stmts(parent_id, child_id):
+                await session.execute(stmt)
+            await session.commit()
+
+        except HTTPException:
+            await session.rollback()
+            raise
+        except Exception as e:
+            await session.rollback()
+            logging.error(f"Unexpected error unlinking role {parent_id} -> {child_id}: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Internal server error during hierarchy update"
+            )
+
+        bus.publish(ROLE_GRANTS, [parent_id, child_id])
+        await _audit_role_update(parent_id, {"child_removed": child_id})
+
+    async def get_effective_permissions(
+        self, session: AsyncSession, role_id: int
+    ) -> RoleEffectivePermissionsResponse:
+        """Собственные и унаследованные права роли одним запросом через замыкание."""
+        await self.get_role(session, role_id)
+
+        descendants = select(role_closure.c.descendant_id).where(
+            role_closure.c.ancestor_id == role_id
+        )
+        granted = select(role_permission.c.permission_id).where(
+            or_(
+                role_permission.c.role_id == role_id,
+                role_permission.c.role_id.in_(descendants)
+            )
+        )
+        permissions = await session.scalars(
+            select(Permission).where(Permission.id.in_(granted)).order_by(Permission.id)
+        )
+        return RoleEffectivePermissionsResponse(
+            role_id=role_id,
+            permissions=[PermissionCreateResponse.model_validate(p) for p in permissions]
+        )
+
+    @staticmethod
+    async def _lock_hierarchy(session: AsyncSession) -> None:
+        """
+        Транзакционная advisory-блокировка: изменения иерархии идут по очереди,
+        иначе два параллельных ребра могли бы вместе образовать цикл.
+        """
+        if session.get_bind().dialect.name == "postgresql":
+            await session.execute(select(func.pg_advisory_xact_lock(HIERARCHY_LOCK_KEY)))
+
+    async def _lock_role(self, session: AsyncSession, role_id: int) -> None:
+        """Блокировка строки роли: параллельные изменения набора прав идут по очереди."""
+        found = await session.scalar(
+            select(Role.id).where(Role.id == role_id).with_for_update()
+        )
+        if found is None:
+            raise self._not_found(role_id)
+
+    @staticmethod
+    async def _resolve_permission_ids(
+        session: AsyncSession, ids: list[int], names: list[str]
+    ) -> set[int]:
+        """Перевод ID и имен прав в множество ID одним запросом; неизвестные -> 400."""
+        if not ids and not names:
+            return set()
+
+        rows = (await session.execute(
+            select(Permission.id, Permission.name).where(
+                or_(Permission.id.in_(ids), Permission.name.in_(names))
+            )
+        )).all()
+        found_ids = {row.id for row in rows}
+        found_names = {row.name for row in rows}
+
+        unknown = [str(pid) for pid in ids if pid not in found_ids]
+        unknown += [name for name in names if name not in found_names]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown permissions: {', '.join(unknown[:20])}"
+            )
+        return found_ids
+
+async def warm_statements(session: AsyncSession) -> None:
+    """Прогрев кэша компиляции и подготовленных выражений горячими запросами чтения."""
+    repo = UserRepository()
+    await _load_role_batch(session, [0])
+    for data in (
+        RoleListRequest(limit=1),
+        RoleListRequest(limit=1, cursor=True),
+        *(RoleListRequest(limit=1, name="warm", match=match) for match in NameMatch),
+    ):
+        await repo.list_role(session, data)
+
+
 def get_user_repo() -> UserRepository:
     return UserRepository()
\ No newline at end of file
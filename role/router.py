@@ -1,13 +1,27 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.cache import CacheStats
+from core.database.importer import ImportParams, ImportReport
 from core.db_helper import db_helper
-from .repository import get_user_repo, UserRepository
+from core.etag import collection_etag, etag_matches, not_modified, resource_etag
+from core.serialization import FastJSONResponse
+from .repository import get_user_repo, role_cache, UserRepository
 from .schema import (
+    RoleBulkCreateRequest,
+    RoleBulkCreateResponse,
     RoleCreateRequest,
     RoleCreateResponse,
+    RoleEffectivePermissionsResponse,
+    RoleHierarchyResponse,
     RoleListRequest,
     RoleListResponse,
+    RolePermissionCheckRequest,
+    RolePermissionCheckResponse,
+    RolePermissionsPatchRequest,
+    RolePermissionsResponse,
+    RolePermissionsSetRequest,
 )
 
 router = APIRouter(tags=["Role"], prefix="/roles")
@@ -20,21 +34,129 @@ async def create_role(
 ):
     return await repo.create_role(session=session, data=data)
 
+@router.post("/bulk", response_model=RoleBulkCreateResponse, status_code=status.HTTP_201_CREATED)
+async def bulk_create_roles(
+    data: RoleBulkCreateRequest,
+    session: AsyncSession = Depends(db_helper.session_getter),
+    repo: UserRepository = Depends(get_user_repo)
+):
+    return await repo.bulk_create_roles(session=session, data=data)
+
+@router.post("/import", response_model=ImportReport)
+async def import_roles(
+    request: Request,
+    params: ImportParams = Depends(),
+    session: AsyncSession = Depends(db_helper.session_getter),
+    repo: UserRepository = Depends(get_user_repo)
+):
+    return await repo.import_roles(
+        session=session,
+        chunks=request.stream(),
+        fmt=params.format,
+        batch_size=params.batch_size
+    )
+
 @router.get("/", response_model=RoleListResponse)
 async def list_roles(
+    request: Request,
     data: RoleListRequest = Depends(),
-    session: AsyncSession = Depends(db_helper.session_getter),
+    session: AsyncSession = Depends(db_helper.read_session_getter),
     repo: UserRepository = Depends(get_user_repo)
 ):
-    return await repo.list_role(session=session, data=data)
+    # ETag из дешевой версии выборки: 304 без чтения и сериализации страницы
+    version = await repo.list_role_version(session=session, data=data)
+    etag = collection_etag("role", request, version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    # Данные уже в форме RoleListResponse: без повторной валидации response_model
+    payload = await repo.list_role(session=session, data=data)
+    return FastJSONResponse(payload, headers={"ETag": etag})
+
+@router.get("/export")
+async def export_roles(
+    session: AsyncSession = Depends(db_helper.read_session_getter),
+    repo: UserRepository = Depends(get_user_repo)
+):
+    return StreamingResponse(
+        repo.export_roles(session=session),
+        media_type="application/x-ndjson"
+    )
+
+@router.get("/cache/stats", response_model=CacheStats)
+async def role_cache_stats():
+    return role_cache.stats()
 
 @router.get("/{role_id}", response_model=RoleCreateResponse)
 async def get_role(
     role_id: int,
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(db_helper.read_session_getter),
+    repo: UserRepository = Depends(get_user_repo)
+):
+    role = await repo.get_role(session=session, role_id=role_id)
+    etag = resource_etag("role", role.id, role.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return role
+
+@router.get("/{role_id}/check", response_model=RolePermissionCheckResponse)
+async def check_role_permission(
+    role_id: int,
+    data: RolePermissionCheckRequest = Depends(),
+    session: AsyncSession = Depends(db_helper.read_session_getter),
+    repo: UserRepository = Depends(get_user_repo)
+):
+    return await repo.check_permission(session=session, role_id=role_id, data=data)
+
+@router.get("/{role_id}/effective-permissions", response_model=RoleEffectivePermissionsResponse)
+async def get_effective_permissions(
+    role_id: int,
+    session: AsyncSession = Depends(db_helper.read_session_getter),
+    repo: UserRepository = Depends(get_user_repo)
+):
+    return await repo.get_effective_permissions(session=session, role_id=role_id)
+
+@router.post(
+    "/{role_id}/children/{child_id}",
+    response_model=RoleHierarchyResponse,
+    status_code=status.HTTP_201_CREATED
+)
+async def add_child_role(
+    role_id: int,
+    child_id: int,
+    session: AsyncSession = Depends(db_helper.session_getter),
+    repo: UserRepository = Depends(get_user_repo)
+):
+    return await repo.add_child_role(session=session, parent_id=role_id, child_id=child_id)
+
+@router.delete("/{role_id}/children/{child_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def remove_child_role(
+    role_id: int,
+    child_id: int,
+    session: AsyncSession = Depends(db_helper.session_getter),
+    repo: UserRepository = Depends(get_user_repo)
+):
+    await repo.remove_child_role(session=session, parent_id=role_id, child_id=child_id)
+
+@router.put("/{role_id}/permissions", response_model=RolePermissionsResponse)
+async def set_role_permissions(
+    role_id: int,
+    data: RolePermissionsSetRequest,
+    session: AsyncSession = Depends(db_helper.session_getter),
+    repo: UserRepository = Depends(get_user_repo)
+):
+    return await repo.set_role_permissions(session=session, role_id=role_id, data=data)
+
+@router.patch("/{role_id}/permissions", response_model=RolePermissionsResponse)
+async def patch_role_permissions(
+    role_id: int,
+    data: RolePermissionsPatchRequest,
     session: AsyncSession = Depends(db_helper.session_getter),
     repo: UserRepository = Depends(get_user_repo)
 ):
-    return await repo.get_role(session=session, role_id=role_id)
+    return await repo.patch_role_permissions(session=session, role_id=role_id, data=data)
 
 @router.put("/{role_id}", response_model=RoleCreateResponse)
 async def update_role(
@@ -1,7 +1,11 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from datetime import datetime
 from typing import List, Optional
 
+from core.database.counting import CountMode
+from core.database.filters import NameMatch
+from permission.schema import PermissionCreateRequest, PermissionCreateResponse, require_name_list
+
 
 class RoleCreateRequest(BaseModel):
     name: str
@@ -15,16 +19,27 @@ class RoleCreateRequest(BaseModel):
 
 
 class RoleCreateResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     name: str
     created_at: datetime
     updated_at: datetime
 
 
+MAX_IDS_PER_REQUEST = 1000
+
+
 class RoleListRequest(BaseModel):
-    page: int
-    limit: int
+    page: int = 1
+    limit: int = 20
     name: Optional[str] = None
+    match: NameMatch = NameMatch.contains
+    cursor: bool = False
+    after: Optional[str] = None
+    include_total: bool = True
+    count: CountMode = CountMode.exact
+    ids: Optional[str] = None
 
     @field_validator("page", "limit")
     @classmethod
@@ -40,14 +55,119 @@ class RoleListRequest(BaseModel):
             return None
         return value.strip().lower()
     
+    @field_validator("ids")
+    @classmethod
+    def validate_ids(cls, value: str | None) -> str | None:
+        if value is None:
+            return None
+        parts = [part.strip() for part in value.split(",") if part.strip()]
+        if not parts or not all(part.isascii() and part.isdigit() for part in parts):
+            raise ValueError("ids must be a comma-separated list of integers")
+        if len(parts) > MAX_IDS_PER_REQUEST:
+            raise ValueError(f"At most {MAX_IDS_PER_REQUEST} ids per request")
+        return ",".join(parts)
+
+    @property
+    def id_list(self) -> List[int]:
+        # Duplicates collapse, order is kept
+        return list(dict.fromkeys(int(part) for part in self.ids.split(","))) if self.ids else []
+
     @property
     def offset(self) -> int:
         return (self.page - 1) * self.limit
 
+    @property
+    def use_cursor(self) -> bool:
+        return self.cursor or self.after is not None
+
 
 class RoleListResponse(BaseModel):
     page: int
     limit: int
-    total: int
-    total_pages: int
+    total: Optional[int] = None
+    total_pages: Optional[int] = None
+    total_mode: Optional[CountMode] = None
+    next_cursor: Optional[str] = None
     roles: List[RoleCreateResponse]
+
+
+class RolePermissionCheckRequest(BaseModel):
+    permission: str
+
+    @field_validator("permission", mode="before")
+    @classmethod
+    def normalize_permission(cls, value: str) -> str:
+        if value is None or not str(value).strip():
+            raise ValueError("Permission must not be empty")
+        return value.strip().lower()
+
+
+class RolePermissionCheckResponse(BaseModel):
+    role_id: int
+    permission: str
+    allowed: bool
+
+
+class RoleBulkCreateRequest(BaseModel):
+    names: List[str] = Field(min_length=1, max_length=10_000)
+
+    @field_validator("names", mode="before")
+    @classmethod
+    def normalize_names(cls, values: List[str]) -> List[str]:
+        # Same rules as a single create; duplicates collapse, order is kept
+        normalized = [
+            RoleCreateRequest.normalize_name(value) for value in require_name_list(values)
+        ]
+        return list(dict.fromkeys(normalized))
+
+
+class RoleBulkCreateResponse(BaseModel):
+    created: List[RoleCreateResponse]
+    existing: List[str]
+
+
+def _normalize_permission_names(values: List[str]) -> List[str]:
+    return list(dict.fromkeys(
+        PermissionCreateRequest.normalize_name(value) for value in require_name_list(values)
+    ))
+
+
+class RolePermissionsSetRequest(BaseModel):
+    """Полный желаемый набор прав роли (по ID и/или по имени)."""
+    permission_ids: List[int] = []
+    permission_names: List[str] = []
+
+    @field_validator("permission_names", mode="before")
+    @classmethod
+    def normalize_names(cls, values: List[str]) -> List[str]:
+        return _normalize_permission_names(values)
+
+
+class RolePermissionsPatchRequest(BaseModel):
+    """Изменения набора прав роли: что добавить и что убрать."""
+    add_ids: List[int] = []
+    add_names: List[str] = []
+    remove_ids: List[int] = []
+    remove_names: List[str] = []
+
+    @field_validator("add_names", "remove_names", mode="before")
+    @classmethod
+    def normalize_names(cls, values: List[str]) -> List[str]:
+        return _normalize_permission_names(values)
+
+
+class RolePermissionsResponse(BaseModel):
+    role_id: int
+    added: int
+    removed: int
+    permission_ids: List[int]
+
+
+class RoleHierarchyResponse(BaseModel):
+    parent_id: int
+    child_id: int
+
+
+class RoleEffectivePermissionsResponse(BaseModel):
+    role_id: int
+    permissions: List[PermissionCreateResponse]
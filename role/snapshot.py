@@ -0,0 +1,400 @@
+"""
+Бинарный снимок графа роль -> право для сайдкаров (проверки без обращения к API).
+
+Формат (little-endian, секции выровнены по 8 байт):
+
+    заголовок   HEADER: magic, версия формата, время генерации (нс),
+                число ролей R, прав P, связей E и смещения семи секций
+    role_ids    int64[R]     ID ролей по возрастанию
+    role_off    uint32[R+1]  смещения имен ролей в role_names
+    role_names  UTF-8
+    perm_off    uint32[P+1]  смещения имен прав в perm_names
+    perm_names  UTF-8, имена отсортированы побайтно
+    row_ptr     uint32[R+1]  CSR: права роли i - col_idx[row_ptr[i]:row_ptr[i+1]]
+    col_idx     uint32[E]    индексы прав (по возрастанию внутри роли)
+
+Права ролей уже включают унаследованные через role_closure. Файл заменяется
+атомарно (os.replace), поэтому читатели, отобразившие старую версию, продолжают
+работать с ней до reload_if_changed().
+"""
+import asyncio
+import mmap
+import os
+import socket
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+from typing import Iterable
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, async_sessionmaker
+
+from core.bus import PERMISSIONS, ROLE_GRANTS, ROLES, InvalidationBus
+from core.database.consistency import snapshot_connection
+from core.logging import logging
+from permission.model import Permission
+from .model import Role, role_closure, role_permission
+
+MAGIC = b"RBACSNAP"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sHHQIII4x7Q")
+ALIGNMENT = 8
+
+
+class SnapshotFormatError(ValueError):
+    pass
+
+
+def _string_table(names: Iterable[bytes]) -> tuple[array, bytes]:
+    """Смещения uint32[n+1] и склеенные имена."""
+    offsets = array("I", [0])
+    blob = bytearray()
+    for name in names:
+        blob += name
+        offsets.append(len(blob))
+    return offsets, bytes(blob)
+
+
+async def build_snapshot(session: AsyncSession) -> bytes:
+    """
+    Сборка снимка из БД: четыре запроса в одной транзакции-снимке
+    (snapshot_connection), эффективные права через замыкание.
+    """
+    if sys.byteorder != "little":
+        raise RuntimeError("Snapshots are written in native little-endian layout")
+
+    async with snapshot_connection(session.bind) as connection:
+        permissions = sorted(
+            (name.encode(), permission_id)
+            for permission_id, name in await connection.execute(
+                select(Permission.id, Permission.name)
+            )
+        )
+        permission_index = {permission_id: i for i, (_, permission_id) in enumerate(permissions)}
+
+        roles = (await connection.execute(select(Role.id, Role.name).order_by(Role.id))).all()
+        direct: dict[int, set[int]] = {role_id: set() for role_id, _ in roles}
+        grants = await connection.execute(
+            select(role_permission.c.role_id, role_permission.c.permission_id)
+        )
+        for role_id, permission_id in grants:
+            direct[role_id].add(permission_index[permission_id])
+
+        effective = {role_id: set(indexes) for role_id, indexes in direct.items()}
+        closure = await connection.execute(
+            select(role_closure.c.ancestor_id, role_closure.c.descendant_id)
+        )
+        for ancestor_id, descendant_id in closure:
+            effective[ancestor_id] |= direct[descendant_id]
+
+    row_ptr = array("I", [0])
+    col_idx = array("I")
+    for role_id, _ in roles:
+        col_idx.extend(sorted(effective[role_id]))
+        row_ptr.append(len(col_idx))
+
+    role_offsets, role_names = _string_table(name.encode() for _, name in roles)
+    permission_offsets, permission_names = _string_table(name for name, _ in permissions)
+
+    sections = [
+        array("q", (role_id for role_id, _ in roles)).tobytes(),
+        role_offsets.tobytes(),
+        role_names,
+        permission_offsets.tobytes(),
+        permission_names,
+        row_ptr.tobytes(),
+        col_idx.tobytes(),
+    ]
+    body = bytearray()
+    offsets = []
+    position = _align(HEADER.size)
+    for section in sections:
+        offsets.append(position)
+        body += section + b"\0" * (_align(len(section)) - len(section))
+        position += _align(len(section))
+
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, HEADER.size, time.time_ns(),
+        len(roles), len(permissions), len(col_idx), *offsets
+    )
+    return header + b"\0" * (_align(HEADER.size) - HEADER.size) + bytes(body)
+
+
+def _align(size: int) -> int:
+    return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """Запись во временный файл рядом и os.replace: читатели не видят частичный файл."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class RBACSnapshot:
+    """
+    Читатель снимка: файл отображается в память (mmap), массивы - memoryview
+    поверх него, поиск роли и права - бинарный. Ничего не парсится и не копируется,
+    страницы файла делят все процессы через page cache.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._open()
+
+    def _open(self) -> None:
+        with open(self.path, "rb") as file:
+            stat = os.fstat(file.fileno())
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._identity = (stat.st_ino, stat.st_mtime_ns)
+        view = self._view = memoryview(self._mmap)
+
+        if len(view) < HEADER.size:
+            raise SnapshotFormatError("Snapshot is truncated")
+        (magic, version, _, generated_ns, roles, permissions, grants,
+         *offsets) = HEADER.unpack_from(view)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise SnapshotFormatError(f"Unsupported snapshot format {magic!r} v{version}")
+        if sys.byteorder != "little":
+            raise SnapshotFormatError("Snapshots can only be mapped on little-endian hosts")
+
+        self.format_version = version
+        self.generated_ns = generated_ns
+        self.role_count = roles
+        self.permission_count = permissions
+        self.grant_count = grants
+
+        ids_at, role_off_at, role_names_at, perm_off_at, perm_names_at, row_at, col_at = offsets
+        self._role_ids = view[ids_at:ids_at + 8 * roles].cast("q")
+        self._role_offsets = view[role_off_at:role_off_at + 4 * (roles + 1)].cast("I")
+        self._role_names = view[role_names_at:role_names_at + self._role_offsets[roles]]
+        self._permission_offsets = view[perm_off_at:perm_off_at + 4 * (permissions + 1)].cast("I")
+        self._permission_names = view[
+            perm_names_at:perm_names_at + self._permission_offsets[permissions]
+        ]
+        self._row_ptr = view[row_at:row_at + 4 * (roles + 1)].cast("I")
+        self._col_idx = view[col_at:col_at + 4 * grants].cast("I")
+
+    def close(self) -> None:
+        # mmap закрывается только после освобождения всех memoryview поверх него
+        for name in ("_role_ids", "_role_offsets", "_role_names", "_permission_offsets",
+                     "_permission_names", "_row_ptr", "_col_idx", "_view"):
+            getattr(self, name).release()
+        self._mmap.close()
+
+    def __enter__(self) -> "RBACSnapshot":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def reload_if_changed(self) -> bool:
+        """Переоткрытие файла, если его заменили новым снимком."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        if (stat.st_ino, stat.st_mtime_ns) == self._identity:
+            return False
+        self.close()
+        self._open()
+        return True
+
+    def _role_index(self, role_id: int) -> int | None:
+        i = bisect_left(self._role_ids, role_id)
+        if i < self.role_count and self._role_ids[i] == role_id:
+            return i
+        return None
+
+    def _permission_name(self, i: int) -> memoryview:
+        return self._permission_names[self._permission_offsets[i]:self._permission_offsets[i + 1]]
+
+    def _permission_index(self, name: str) -> int | None:
+        key = name.encode()
+        low, high = 0, self.permission_count
+        while low < high:
+            middle = (low + high) // 2
+            # Копируется только сравниваемое имя
+            if self._permission_name(middle).tobytes() < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.permission_count and self._permission_name(low) == key:
+            return low
+        return None
+
+    def has_role(self, role_id: int) -> bool:
+        return self._role_index(role_id) is not None
+
+    def role_name(self, role_id: int) -> str:
+        i = self._role_index(role_id)
+        if i is None:
+            raise KeyError(role_id)
+        return str(self._role_names[self._role_offsets[i]:self._role_offsets[i + 1]], "utf-8")
+
+    def check(self, role_id: int, permission: str) -> bool:
+        """Есть ли у роли право (с учетом наследования); KeyError для неизвестной роли."""
+        i = self._role_index(role_id)
+        if i is None:
+            raise KeyError(role_id)
+        index = self._permission_index(permission)
+        if index is None:
+            return False
+        row = self._col_idx[self._row_ptr[i]:self._row_ptr[i + 1]]
+        j = bisect_left(row, index)
+        return j < len(row) and row[j] == index
+
+    def permissions(self, role_id: int) -> list[str]:
+        """Имена всех эффективных прав роли."""
+        i = self._role_index(role_id)
+        if i is None:
+            raise KeyError(role_id)
+        return [
+            str(self._permission_name(index), "utf-8")
+            for index in self._col_idx[self._row_ptr[i]:self._row_ptr[i + 1]]
+        ]
+
+
+class SnapshotWriter:
+    """
+    Перегенерация снимка при изменениях каталога: события шины склеиваются
+    в одну запись не чаще раза в ``debounce`` секунд.
+
+    Все воркеры получают одни и те же события, а файл перезаписывает только
+    лидер: процесс, держащий сессионный advisory lock PostgreSQL на
+    отдельном соединении (ключ - хост и путь к файлу). Остальные пропускают
+    запись и пробуют стать лидером при следующем событии, так что после
+    остановки лидера его место занимает другой воркер.
+    """
+
+    def __init__(
+        self, path: str, session_factory: async_sessionmaker[AsyncSession], debounce: float = 2.0
+    ) -> None:
+        self.path = path
+        self.session_factory = session_factory
+        self.debounce = debounce
+        self._dirty = False
+        self._task: asyncio.Task | None = None
+        self._subscribed = False
+        self._lock_key = zlib.crc32(f"{socket.gethostname()}:{os.path.abspath(path)}".encode())
+        self._leader: AsyncConnection | None = None
+
+    def attach(self, bus: InvalidationBus) -> None:
+        """Подписка на изменения ролей, прав и связей между ними."""
+        if self._subscribed:
+            return
+        for topic in (ROLES, PERMISSIONS, ROLE_GRANTS):
+            bus.subscribe(topic, self.schedule)
+        self._subscribed = True
+
+    def detach(self, bus: InvalidationBus) -> None:
+        if not self._subscribed:
+            return
+        for topic in (ROLES, PERMISSIONS, ROLE_GRANTS):
+            bus.unsubscribe(topic, self.schedule)
+        self._subscribed = False
+
+    def schedule(self, ids: list[int] | None = None) -> None:
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while self._dirty:
+            await asyncio.sleep(self.debounce)
+            self._dirty = False
+            try:
+                if await self._is_leader():
+                    await self.write()
+            except asyncio.CancelledError:
+                self._dirty = True
+                raise
+            except Exception as e:
+                logging.error(f"RBAC snapshot regeneration failed: {e}")
+
+    async def _is_leader(self) -> bool:
+        """Захват (или проверка) блокировки писателя; без PostgreSQL - всегда лидер."""
+        engine = self.session_factory.kw["bind"]
+        if engine.dialect.name != "postgresql":
+            return True
+
+        if self._leader is not None:
+            try:
+                # Блокировка держится, пока живо соединение
+                await self._leader.execute(text("SELECT 1"))
+                await self._leader.commit()
+                return True
+            except Exception as e:
+                logging.warning(f"RBAC snapshot writer lost its lock connection: {e}")
+            await self._release_leadership()
+
+        connection = await engine.connect()
+        try:
+            acquired = await connection.scalar(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": self._lock_key}
+            )
+            # Блокировка сессионная: транзакцию закрываем, соединение держим
+            await connection.commit()
+        except BaseException:
+            await connection.close()
+            raise
+        if not acquired:
+            await connection.close()
+            return False
+        self._leader = connection
+        return True
+
+    async def _release_leadership(self) -> None:
+        connection, self._leader = self._leader, None
+        if connection is None:
+            return
+        try:
+            await connection.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": self._lock_key}
+            )
+            await connection.commit()
+            await connection.close()
+        except Exception:
+            # Блокировка снимается вместе с закрытым соединением
+            await connection.invalidate()
+
+    async def write(self) -> int:
+        """Немедленная запись снимка (без проверки лидерства); возвращает размер файла."""
+        started = time.perf_counter()
+        async with self.session_factory() as session:
+            data = await build_snapshot(session)
+        await asyncio.to_thread(write_atomic, self.path, data)
+        logging.info(
+            f"RBAC snapshot written to {self.path}: {len(data)} bytes "
+            f"in {time.perf_counter() - started:.3f}s"
+        )
+        return len(data)
+
+    async def stop(self) -> None:
+        """Дописывает отложенную перегенерацию, не дожидаясь debounce."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        try:
+            if self._dirty and await self._is_leader():
+                self._dirty = False
+                await self.write()
+        finally:
+            await self._release_leadership()
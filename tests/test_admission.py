@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from core.admission import (
+    PRIMARY,
+    READ,
+    WRITE,
+    AdmissionController,
+    Limiter,
+    Rejected,
+)
+from core.config import AdmissionConfig
+
+
+def _request(path: str = "/roles/", method: str = "GET") -> Request:
+    return Request({
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": [],
+        "query_string": b"",
+    })
+
+
+async def _settle() -> None:
+    # Lets woken waiters run
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    async def scenario():
+        config = AdmissionConfig(queue_size=1, max_wait=5.0, retry_after=7, internal_connections=1)
+        # One request slot on the primary: 2 connections minus 1 internal
+        admission = AdmissionController(config, capacity=2)
+        assert admission.primary.limit == 1
+
+        release = await admission.acquire(_request(), PRIMARY, WRITE)
+        queued = asyncio.ensure_future(admission.acquire(_request(), PRIMARY, WRITE))
+        await _settle()
+        assert admission.waiting(WRITE) == 1
+
+        with pytest.raises(HTTPException) as error:
+            await admission.acquire(_request(), PRIMARY, WRITE)
+        assert error.value.status_code == 503
+        assert error.value.headers == {"Retry-After": "7"}
+
+        # The queued request gets the slot once it is freed
+        release()
+        (await queued)()
+        assert admission.primary.active == {WRITE: 0, READ: 0}
+
+    asyncio.run(scenario())
+
+
+def test_wait_beyond_max_wait_is_rejected():
+    async def scenario():
+        config = AdmissionConfig(queue_size=10, max_wait=0.05, internal_connections=1)
+        admission = AdmissionController(config, capacity=2)
+
+        await admission.acquire(_request(), PRIMARY, WRITE)
+        with pytest.raises(HTTPException) as error:
+            await admission.acquire(_request(), PRIMARY, WRITE)
+        assert error.value.status_code == 503
+        assert admission.waiting(WRITE) == 0
+
+    asyncio.run(scenario())
+
+
+def test_queued_writes_are_admitted_before_queued_reads():
+    async def scenario():
+        limiter = Limiter(1, queue_size=10)
+        await limiter.acquire(READ, timeout=1)
+
+        order: list[str] = []
+
+        async def wait(priority: str) -> None:
+            await limiter.acquire(priority, timeout=1)
+            order.append(priority)
+            limiter.release(priority)
+
+        # The read queued first, the write still goes first
+        waiters = [asyncio.ensure_future(wait(READ)), asyncio.ensure_future(wait(WRITE))]
+        await _settle()
+        limiter.release(READ)
+        await asyncio.gather(*waiters)
+        assert order == [WRITE, READ]
+
+    asyncio.run(scenario())
+
+
+def test_reads_are_capped_by_their_class_limit():
+    async def scenario():
+        limiter = Limiter(2, queue_size=10, class_limits={READ: 1})
+        await limiter.acquire(READ, timeout=1)
+
+        with pytest.raises(Rejected) as error:
+            await limiter.acquire(READ, timeout=0.05)
+        assert error.value.reason == "timeout"
+
+        # The slot left over is kept for writes
+        await limiter.acquire(WRITE, timeout=0.05)
+        assert limiter.active == {WRITE: 1, READ: 1}
+
+    asyncio.run(scenario())
+
+
+def test_internal_work_does_not_queue_behind_requests():
+    async def scenario():
+        config = AdmissionConfig(queue_size=1, max_wait=0.05, internal_connections=1)
+        admission = AdmissionController(config, capacity=2)
+
+        # Requests hold every request slot; a loader batch still runs
+        await admission.acquire(_request(), PRIMARY, READ)
+        release = await admission.acquire_internal(PRIMARY, "loader:roles")
+        with pytest.raises(HTTPException):
+            await admission.acquire_internal(PRIMARY, "loader:roles")
+        release()
+
+    asyncio.run(scenario())
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from core.database.base import Base
+from role.model import Role, role_closure
+from role.repository import UserRepository
+
+
+async def _session_factory(roles: int) -> async_sessionmaker[AsyncSession]:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.execute(insert(Role).values([{"name": f"r{i}"} for i in range(roles)]))
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+async def _closure(session: AsyncSession) -> set[tuple[int, int, int]]:
+    return {tuple(row) for row in await session.execute(select(role_closure))}
+
+
+async def _diamond(repo: UserRepository, session: AsyncSession) -> None:
+    # 1 -> 2 -> 4 and 1 -> 3 -> 4: two paths from 1 to 4
+    for parent_id, child_id in [(1, 2), (1, 3), (2, 4), (3, 4)]:
+        await repo.add_child_role(session, parent_id, child_id)
+
+
+def test_closure_counts_paths_through_diamond():
+    async def scenario():
+        repo = UserRepository()
+        async with (await _session_factory(4))() as session:
+            await _diamond(repo, session)
+            assert await _closure(session) == {
+                (1, 2, 1), (1, 3, 1), (1, 4, 2), (2, 4, 1), (3, 4, 1),
+            }
+
+            # 1 still reaches 4 through 3
+            await repo.remove_child_role(session, 2, 4)
+            assert await _closure(session) == {(1, 2, 1), (1, 3, 1), (1, 4, 1), (3, 4, 1)}
+
+            await repo.remove_child_role(session, 3, 4)
+            assert await _closure(session) == {(1, 2, 1), (1, 3, 1)}
+
+            await repo.add_child_role(session, 2, 4)
+            assert await _closure(session) == {(1, 2, 1), (1, 3, 1), (1, 4, 1), (2, 4, 1)}
+
+    asyncio.run(scenario())
+
+
+def test_closure_removes_ancestors_of_removed_edge():
+    async def scenario():
+        repo = UserRepository()
+        async with (await _session_factory(4))() as session:
+            # Chain 1 -> 2 -> 3 -> 4, then cut it in the middle
+            for parent_id, child_id in [(1, 2), (2, 3), (3, 4)]:
+                await repo.add_child_role(session, parent_id, child_id)
+            await repo.remove_child_role(session, 2, 3)
+            assert await _closure(session) == {(1, 2, 1), (3, 4, 1)}
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("parent_id, child_id", [(4, 1), (4, 2), (2, 1), (3, 3)])
+def test_cycle_is_rejected_without_touching_closure(parent_id, child_id):
+    async def scenario():
+        repo = UserRepository()
+        async with (await _session_factory(4))() as session:
+            await _diamond(repo, session)
+            before = await _closure(session)
+
+            with pytest.raises(HTTPException) as error:
+                await repo.add_child_role(session, parent_id, child_id)
+            assert error.value.status_code == 409
+            assert await _closure(session) == before
+
+    asyncio.run(scenario())
+
+
+def test_duplicate_edge_is_rejected():
+    async def scenario():
+        repo = UserRepository()
+        async with (await _session_factory(4))() as session:
+            await _diamond(repo, session)
+            with pytest.raises(HTTPException) as error:
+                await repo.add_child_role(session, 1, 2)
+            assert error.value.status_code == 409
+            assert (1, 2, 1) in await _closure(session)
+
+    asyncio.run(scenario())